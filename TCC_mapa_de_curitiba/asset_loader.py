@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+ASSET_LOADER_WORKERS = 4
+
+
+# --- Descodificação de Imagens em Paralelo ---
+class ParallelImageLoader:
+    """Começa a descodificar cada imagem numa thread assim que é pedida.
+
+    pygame.image.load larga o GIL enquanto descodifica, por isso o mapa, a névoa
+    e o atlas de ícones são lidos ao mesmo tempo enquanto a thread principal
+    trata da janela e das fontes. A conversão para o formato do ecrã (convert)
+    continua a ser feita na thread principal.
+    """
+
+    def __init__(self, workers=ASSET_LOADER_WORKERS):
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='assets')
+        self._futures = {}
+
+    def submit(self, name, path):
+        self._futures[name] = self._executor.submit(pygame.image.load, path)
+
+    def pending(self, name):
+        return name in self._futures
+
+    def result(self, name):
+        """Espera pela imagem e devolve-a; erros de leitura (pygame.error, FileNotFoundError) são relançados aqui."""
+        return self._futures.pop(name).result()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
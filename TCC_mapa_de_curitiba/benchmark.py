@@ -0,0 +1,370 @@
+"""Benchmark sem janela: reproduz uma sequência de input e mede o tempo de cada fase do frame.
+
+    python benchmark.py                          # guião embutido, mapa sintético 8192x8192
+    python benchmark.py --map-size 16761x16910 --pois 5000 --out resultado.json
+    python benchmark.py --script guiao.json      # guião próprio (mesmo formato do DEFAULT_SCRIPT)
+    python benchmark.py --record gravacao.json   # joga normalmente e grava o input
+    python benchmark.py --script gravacao.json   # reproduz a gravação
+    python benchmark.py --renderer software      # backend de texturas com o renderer por software do SDL
+
+O resultado é um JSON com percentis (ms) por fase, o pico de memória do processo e,
+em "search", o tempo de construção do índice de pesquisa e a latência (µs) de cada tecla.
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1') # A mensagem do pygame estragaria o JSON no stdout
+if '--record' not in sys.argv:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+import main
+from poi_store import MemoryPoiStore
+from poi_search import PoiSearchIndex
+from parallel_scale import scale_pool
+from profiler import frame_profiler
+from pontos_turisticos import PONTOS_TURISTICOS_DATA
+
+PHASES = ('handle_events', 'update_all', 'draw_all', 'flip', 'frame')
+DRAW_PHASES = ('map_scale', 'map_blit', 'fog_scale', 'fog_blit', 'pois', 'minimap', 'card') # Medidas pelo profiler do jogo
+PERCENTILES = (50, 90, 99)
+RECORDED_EVENT_TYPES = {
+    pygame.MOUSEBUTTONDOWN: 'MOUSEBUTTONDOWN',
+    pygame.MOUSEBUTTONUP: 'MOUSEBUTTONUP',
+    pygame.MOUSEMOTION: 'MOUSEMOTION',
+    pygame.MOUSEWHEEL: 'MOUSEWHEEL',
+    pygame.VIDEORESIZE: 'VIDEORESIZE',
+    pygame.KEYDOWN: 'KEYDOWN',
+    pygame.TEXTINPUT: 'TEXTINPUT',
+}
+SEARCH_QUERIES = ("praça tiradentes", "opera de arame", "jardim botanico", "museu oscar", "ponto 123", "parque") # Escritas tecla a tecla
+
+COMPLETE_POI_MAX_ZOOM_STEPS = 15 # Do mapa inteiro ao zoom máximo são ~12 passos da roda
+
+# Cada passo é um dicionário com "action"; ver Replayer para os parâmetros de cada ação
+DEFAULT_SCRIPT = [
+    {"action": "wait", "frames": 10},
+    {"action": "zoom", "direction": 1, "pos": [450, 360], "steps": 12},
+    {"action": "drag", "from": [150, 360], "to": [750, 360], "frames": 60},
+    {"action": "drag", "from": [450, 100], "to": [450, 650], "frames": 60},
+    {"action": "zoom", "direction": -1, "pos": [300, 200], "steps": 12},
+    {"action": "complete_poi", "poi": 0},
+    {"action": "complete_poi", "poi": 1},
+    {"action": "zoom", "direction": 1, "pos": [450, 360], "steps": 6},
+    {"action": "drag", "from": [700, 500], "to": [200, 200], "frames": 45},
+    {"action": "complete_poi", "poi": 2},
+    {"action": "search", "text": "jardim bot", "pick": 0},
+    {"action": "wait", "frames": 30},
+]
+
+
+# --- Mapa e POIs Sintéticos ---
+def make_synthetic_map(size, seed=1):
+    """Gera um mapa com textura suave a partir de um pequeno ruído ampliado."""
+    rng = random.Random(seed)
+    noise = pygame.Surface((64, 64))
+    for y in range(64):
+        for x in range(64):
+            noise.set_at((x, y), (rng.randint(150, 230), rng.randint(150, 230), rng.randint(140, 210)))
+    return pygame.transform.smoothscale(noise, size)
+
+
+def make_poi_store(map_size, extra_pois, seed=1):
+    """Os POIs reais reposicionados para o mapa sintético, mais 'extra_pois' pontos aleatórios."""
+    rng = random.Random(seed)
+    texts = random.Random(seed + 1) # Descrições reais sorteadas, para o índice de pesquisa ter texto a sério
+    sx, sy = map_size[0] / 16761, map_size[1] / 16910
+    records = [dict(record, pos=(record["pos"][0] * sx, record["pos"][1] * sy)) for record in PONTOS_TURISTICOS_DATA]
+    for i in range(extra_pois):
+        records.append({"id": f"sintetico_{i}", "nome": f"Ponto {i}", "descricao": texts.choice(PONTOS_TURISTICOS_DATA)["descricao"],
+                        "imagem_path": "", "pos": (rng.uniform(0, map_size[0]), rng.uniform(0, map_size[1]))})
+    return MemoryPoiStore(records)
+
+
+# --- Reprodução de Guiões ---
+class Replayer:
+    """Executa o guião frame a frame, medindo cada fase do Game."""
+
+    def __init__(self, game, fps=0):
+        self.game = game
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.samples = {phase: [] for phase in PHASES + DRAW_PHASES}
+        frame_profiler.enabled = True # Só regista; o HUD continua desligado
+
+    def post(self, event_type, **attrs):
+        pygame.event.post(pygame.event.Event(event_type, attrs))
+
+    def frame(self):
+        game = self.game
+        t0 = time.perf_counter()
+        game.handle_events()
+        t1 = time.perf_counter()
+        game.update_all()
+        t2 = time.perf_counter()
+        game.draw_all()
+        t3 = time.perf_counter()
+        game.present()
+        t4 = time.perf_counter()
+        for phase, value in zip(PHASES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t4 - t0)):
+            self.samples[phase].append(value * 1000)
+        draw_phases = frame_profiler.take_current()
+        for phase in DRAW_PHASES:
+            self.samples[phase].append(draw_phases[phase])
+        if self.fps:
+            self.clock.tick(self.fps)
+
+    def move_mouse(self, pos, rel=(0, 0), buttons=(0, 0, 0)):
+        self.post(pygame.MOUSEMOTION, pos=tuple(pos), rel=tuple(rel), buttons=buttons)
+
+    def wheel(self, direction):
+        self.post(pygame.MOUSEWHEEL, x=0, y=direction, flipped=False, precise_x=0.0, precise_y=float(direction))
+
+    def click(self, pos):
+        self.post(pygame.MOUSEBUTTONDOWN, pos=tuple(pos), button=1)
+        self.post(pygame.MOUSEBUTTONUP, pos=tuple(pos), button=1)
+
+    def key(self, key, text='', mod=0):
+        self.post(pygame.KEYDOWN, key=key, mod=mod, unicode=text, scancode=0)
+        self.post(pygame.KEYUP, key=key, mod=mod, unicode=text, scancode=0)
+
+    def wait_ms(self, ms):
+        end = time.perf_counter() + ms / 1000
+        while time.perf_counter() < end:
+            self.frame()
+
+    def run_step(self, step):
+        action = step["action"]
+        if action == "wait":
+            for _ in range(step.get("frames", 0)):
+                self.frame()
+            if step.get("ms"):
+                self.wait_ms(step["ms"])
+        elif action == "zoom":
+            self.move_mouse(step["pos"])
+            for _ in range(step.get("steps", 1)):
+                self.wheel(step["direction"])
+                self.frame()
+        elif action == "drag":
+            frames = max(1, step["frames"])
+            (x0, y0), (x1, y1) = step["from"], step["to"]
+            self.post(pygame.MOUSEBUTTONDOWN, pos=(x0, y0), button=1)
+            last = (x0, y0)
+            for i in range(1, frames + 1):
+                pos = (round(x0 + (x1 - x0) * i / frames), round(y0 + (y1 - y0) * i / frames))
+                self.move_mouse(pos, (pos[0] - last[0], pos[1] - last[1]), (1, 0, 0))
+                last = pos
+                self.frame()
+            self.post(pygame.MOUSEBUTTONUP, pos=last, button=1)
+            self.frame()
+        elif action == "complete_poi":
+            self.complete_poi(step["poi"])
+        elif action == "search":
+            self.search(step["text"], step.get("pick", 0))
+        elif action == "recorded":
+            self.replay_recording(step["events"])
+        else:
+            raise ValueError(f"Ação desconhecida no guião: {action}")
+
+    def complete_poi(self, index):
+        """Centra a câmara no POI, abre o cartão, carrega em 'Concluído' e espera pela revelação.
+
+        Se o cartão aberto não for o deste POI, ou o POI não ficar concluído,
+        levanta RuntimeError: o benchmark não pode medir menos revelações do
+        que o guião pede sem avisar.
+        """
+        game = self.game
+        poi = next((p for p in game.pois if p.index == index), None)
+        if poi is None:
+            raise ValueError(f"complete_poi: não existe nenhum POI com o índice {index}")
+        poi.is_visible = True
+        game.camera.center = (int(poi.map_pos.x), int(poi.map_pos.y))
+        game.check_camera_bounds()
+        self.frame()
+        # Com os ícones sobrepostos o clique escolheria outro POI: aproxima (como faria quem joga) até ser este
+        for _ in range(COMPLETE_POI_MAX_ZOOM_STEPS):
+            if game.pick_poi(poi.rect.center) is poi:
+                break
+            self.move_mouse(poi.rect.center)
+            self.wheel(1)
+            self.frame()
+        self.click(poi.rect.center)
+        self.frame()
+        if game.active_card is None or game.active_card.poi is not poi:
+            raise RuntimeError(f"complete_poi: o clique não abriu o cartão do POI {index}")
+        self.wait_ms(game.active_card.size_anim_duration + 50)
+        self.click(game.active_card.button_screen_rect.center)
+        self.frame()
+        self.wait_ms(poi.shake_duration + 500)
+        if not poi.is_completed:
+            raise RuntimeError(f"complete_poi: o POI {index} não ficou concluído")
+
+    def search(self, text, pick=0):
+        """Abre a pesquisa, escreve o texto uma tecla por frame, escolhe o resultado 'pick' e espera pela viagem."""
+        self.key(pygame.K_f, mod=pygame.KMOD_LCTRL)
+        self.frame()
+        for char in text:
+            self.post(pygame.TEXTINPUT, text=char)
+            self.frame()
+        for _ in range(pick):
+            self.key(pygame.K_DOWN)
+            self.frame()
+        self.key(pygame.K_RETURN, '\r')
+        self.frame()
+        self.wait_ms(main.CAMERA_FLIGHT_DURATION + 100)
+
+    def replay_recording(self, recorded):
+        by_frame = {}
+        for entry in recorded:
+            by_frame.setdefault(entry["frame"], []).append(entry)
+        for frame_index in range(max(by_frame, default=-1) + 1):
+            for entry in by_frame.get(frame_index, ()):
+                attrs = {k: tuple(v) if isinstance(v, list) else v for k, v in entry["attrs"].items()}
+                self.post(getattr(pygame, entry["type"]), **attrs)
+            self.frame()
+
+
+# --- Gravação de Input ---
+def record(game, path):
+    """Corre o jogo numa janela normal e grava os eventos de rato por frame até fechar."""
+    recorded = []
+    frame_index = 0
+    while True:
+        events = pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT:
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump([{"action": "recorded", "events": recorded}], f)
+                print(f"{frame_index} frames gravados em '{path}'.")
+                return
+            if event.type in RECORDED_EVENT_TYPES:
+                attrs = {k: v for k, v in event.dict.items() if isinstance(v, (int, float, bool, str, tuple, list))}
+                recorded.append({"frame": frame_index, "type": RECORDED_EVENT_TYPES[event.type], "attrs": attrs})
+        game.handle_events(events)
+        game.update_all()
+        game.draw_all()
+        game.present()
+        game.clock.tick(60)
+        frame_index += 1
+
+
+# --- Relatório ---
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def summarize(samples):
+    report = {}
+    for phase, values in samples.items():
+        ordered = sorted(values)
+        stats = {f"p{p}": percentile(ordered, p) for p in PERCENTILES}
+        stats["max"] = ordered[-1] if ordered else None
+        stats["mean"] = sum(ordered) / len(ordered) if ordered else None
+        report[phase] = stats
+    return report
+
+
+def measure_search(game, queries=SEARCH_QUERIES):
+    """Constrói o índice de pesquisa dos POIs do jogo e mede cada prefixo das pesquisas, como se fosse escrito."""
+    start = time.perf_counter()
+    index = PoiSearchIndex(game.poi_store.load_texts())
+    build_ms = (time.perf_counter() - start) * 1000
+    latencies = []
+    for query in queries:
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            index.search(query[:end])
+            latencies.append((time.perf_counter() - start) * 1e6)
+    return {"index_build_ms": build_ms, "keystrokes": len(latencies), "query_us": summarize({"query": latencies})["query"]}
+
+
+def peak_memory_mb():
+    """Pico de memória residente do processo (None onde o módulo 'resource' não existe)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux devolve KiB, macOS devolve bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def parse_size(text):
+    w, h = text.lower().split('x')
+    return int(w), int(h)
+
+
+def main_benchmark(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sem janela do mapa interativo.")
+    parser.add_argument('--script', help="Guião JSON (lista de passos) ou gravação feita com --record")
+    parser.add_argument('--record', help="Joga numa janela normal e grava o input neste ficheiro")
+    parser.add_argument('--map-size', type=parse_size, default=(8192, 8192), help="Tamanho do mapa sintético, ex.: 8192x8192")
+    parser.add_argument('--real-assets', action='store_true', help="Usa os ficheiros reais do mapa em vez do mapa sintético")
+    parser.add_argument('--pois', type=int, default=0, help="POIs sintéticos extra espalhados pelo mapa")
+    parser.add_argument('--fps', type=int, default=0, help="Limite de FPS durante a reprodução (0 = sem limite)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--scale-workers', type=int, help="Threads para escalar o mapa e a névoa (1 = sequencial)")
+    parser.add_argument('--renderer', choices=('surface', 'texture', 'software'), default='surface',
+                        help="Backend de desenho (texture/software usam texturas do SDL)")
+    parser.add_argument('--out', help="Ficheiro para o JSON do resultado (por omissão, stdout)")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    if args.scale_workers:
+        scale_pool.configure(args.scale_workers)
+    pygame.init()
+    start = time.perf_counter()
+    if args.real_assets or args.record:
+        game = main.Game(render_backend=args.renderer)
+    else:
+        game = main.Game(map_image=make_synthetic_map(args.map_size, args.seed),
+                         poi_store=make_poi_store(args.map_size, args.pois, args.seed), render_backend=args.renderer)
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    if args.record:
+        record(game, args.record)
+        return
+
+    script = DEFAULT_SCRIPT
+    if args.script:
+        with open(args.script, encoding='utf-8') as f:
+            script = json.load(f)
+
+    # Os avisos do jogo (ícones em falta dos POIs sintéticos) vão para stderr para não misturar com o JSON
+    replayer = Replayer(game, args.fps)
+    with contextlib.redirect_stdout(sys.stderr):
+        for step in script:
+            replayer.run_step(step)
+
+    result = {
+        "map_size": list(game.map_full_rect.size),
+        "pois": len(game.pois),
+        "frames": len(replayer.samples['frame']),
+        "scale_workers": scale_pool.workers,
+        "renderer": "surface" if game.textures is None else args.renderer,
+        "startup_ms": startup_ms,
+        "phases_ms": summarize(replayer.samples),
+        "search": measure_search(game),
+        "peak_memory_mb": peak_memory_mb(),
+    }
+    output = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main_benchmark()
@@ -0,0 +1,240 @@
+import math
+import pygame
+import pygame.gfxdraw
+from viewport import camera_render_rect, snap_to_screen
+from profiler import frame_profiler
+from parallel_scale import scale_pool
+
+FOG_TILE_SIZE = 256 # Lado (em pixels do mapa) de cada tile da névoa
+
+# Marcador partilhado para tiles totalmente revelados (os totalmente cobertos
+# simplesmente não aparecem no dicionário de tiles)
+CLEARED = object()
+
+# Resultado de _circle_overlap
+OUTSIDE, EDGE, INSIDE = 0, 1, 2
+
+
+# --- Névoa em Tiles Esparsos ---
+class FogLayer:
+    """Guarda a névoa do mapa em tiles de tamanho fixo.
+
+    Tiles totalmente cobertos ou totalmente revelados não ocupam memória própria;
+    só os tiles atravessados pela borda de uma revelação são materializados.
+    """
+
+    def __init__(self, map_size, fog_color, tile_size=FOG_TILE_SIZE):
+        self.map_rect = pygame.Rect((0, 0), map_size)
+        self.tile_size = tile_size
+        self.cols = math.ceil(self.map_rect.width / tile_size)
+        self.rows = math.ceil(self.map_rect.height / tile_size)
+        self.fog_color = fog_color
+        self.fogged_tile = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
+        self.fogged_tile.fill(fog_color)
+        self.tiles = {} # (tx, ty) -> CLEARED ou Surface materializada
+        self._scaled_fogged = {} # tamanho no ecrã -> tile coberto já escalado
+        self._hole_layer = None # Camada do tamanho do ecrã usada enquanto há revelações a decorrer
+        self._pending = {} # (tx, ty) -> círculos restaurados ainda por recortar nesse tile
+        self.version = 0 # Muda sempre que a névoa muda, para quem guarda frames já desenhados
+
+    @classmethod
+    def from_surface(cls, fog_image, fallback_color, tile_size=FOG_TILE_SIZE):
+        """Corta uma imagem de névoa em tiles, partilhando os que forem uniformes."""
+        fog_color = None
+        uniform_tiles = {}
+        map_rect = fog_image.get_rect()
+        for ty in range(math.ceil(map_rect.height / tile_size)):
+            for tx in range(math.ceil(map_rect.width / tile_size)):
+                rect = pygame.Rect(tx * tile_size, ty * tile_size, tile_size, tile_size).clip(map_rect)
+                uniform_tiles[(tx, ty)] = _uniform_color(fog_image.subsurface(rect))
+                if fog_color is None and uniform_tiles[(tx, ty)] and uniform_tiles[(tx, ty)][3] > 0:
+                    fog_color = uniform_tiles[(tx, ty)]
+
+        layer = cls(map_rect.size, fog_color or fallback_color, tile_size)
+        for key, color in uniform_tiles.items():
+            if color == layer.fog_color:
+                continue
+            if color is not None and color[3] == 0:
+                layer.tiles[key] = CLEARED
+            else:
+                layer.tiles[key] = fog_image.subsurface(layer.tile_rect(*key)).copy()
+        return layer
+
+    def tile_rect(self, tx, ty):
+        ts = self.tile_size
+        return pygame.Rect(tx * ts, ty * ts, ts, ts).clip(self.map_rect)
+
+    def tiles_in_rect(self, map_rect):
+        """Devolve os índices (tx, ty) dos tiles que tocam o retângulo dado."""
+        area = map_rect.clip(self.map_rect)
+        if area.width <= 0 or area.height <= 0:
+            return
+        ts = self.tile_size
+        for ty in range(area.top // ts, (area.bottom - 1) // ts + 1):
+            for tx in range(area.left // ts, (area.right - 1) // ts + 1):
+                yield tx, ty
+
+    def _materialize(self, key, rect):
+        surface = self.tiles.get(key)
+        if surface is None:
+            surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+            surface.fill(self.fog_color)
+            self.tiles[key] = surface
+        return surface
+
+    def _tiles_touched(self, cx, cy, r):
+        """Devolve (tile, INSIDE/EDGE) para os tiles ainda com névoa que o círculo toca."""
+        bounds = pygame.Rect(cx - r, cy - r, r * 2 + 1, r * 2 + 1)
+        for key in list(self.tiles_in_rect(bounds)):
+            if self.tiles.get(key) is CLEARED:
+                continue
+            overlap = _circle_overlap(self.tile_rect(*key), cx, cy, r)
+            if overlap != OUTSIDE:
+                yield key, overlap
+
+    def _cut_circle(self, key, cx, cy, r):
+        rect = self.tile_rect(*key)
+        surface = self._materialize(key, rect)
+        x, y = cx - rect.x, cy - rect.y
+        pygame.gfxdraw.filled_circle(surface, x, y, r, (0, 0, 0, 0))
+        pygame.gfxdraw.aacircle(surface, x, y, r, (0, 0, 0, 0))
+
+    def clear_circle(self, map_pos, radius):
+        """Revela um círculo do mapa, materializando só os tiles cortados pela borda."""
+        cx, cy, r = int(map_pos[0]), int(map_pos[1]), int(radius)
+        if r <= 0:
+            return
+        self.version += 1
+        for key, overlap in self._tiles_touched(cx, cy, r):
+            if overlap == INSIDE:
+                self.tiles[key] = CLEARED
+                self._pending.pop(key, None)
+            else:
+                self._cut_circle(key, cx, cy, r)
+
+    def restore_circles(self, circles):
+        """Aplica revelações gravadas (x, y, raio) sem desenhar nada ainda.
+
+        Os tiles cobertos por completo ficam logo revelados; os atravessados pela
+        borda guardam os círculos e só os recortam quando forem desenhados.
+        """
+        self.version += 1
+        for cx, cy, r in circles:
+            if r <= 0:
+                continue
+            for key, overlap in self._tiles_touched(int(cx), int(cy), int(r)):
+                if overlap == INSIDE:
+                    self.tiles[key] = CLEARED
+                    self._pending.pop(key, None)
+                else:
+                    self._pending.setdefault(key, []).append((int(cx), int(cy), int(r)))
+
+    def tile_state(self, key):
+        """Estado atual do tile (None, CLEARED ou Surface), recortando antes os círculos pendentes."""
+        if key in self._pending:
+            for cx, cy, r in self._pending.pop(key):
+                if self.tiles.get(key) is not CLEARED:
+                    self._cut_circle(key, cx, cy, r)
+        return self.tiles.get(key)
+
+    def _get_scaled_fogged(self, size):
+        scaled = self._scaled_fogged.get(size)
+        if scaled is None:
+            if len(self._scaled_fogged) > 16:
+                self._scaled_fogged.clear()
+            scaled = pygame.transform.scale(self.fogged_tile, size)
+            self._scaled_fogged[size] = scaled
+        return scaled
+
+    def draw(self, target, camera, scale, holes=()):
+        """Desenha em 'target' a névoa visível pela câmara, com 'scale' pixels de ecrã por pixel do mapa.
+
+        'holes' são círculos (pos, raio) no mapa de revelações ainda em curso:
+        são recortados só no ecrã, sem alterar os tiles, até a animação acabar.
+        """
+        t = frame_profiler.start()
+        holes = [(int(pos[0]), int(pos[1]), int(radius)) for pos, radius in holes if radius > 0]
+        blit_list = []
+        jobs, job_slots = [], []
+        for key in self.tiles_in_rect(camera_render_rect(camera, self.map_rect)):
+            state = self.tile_state(key) if self._pending else self.tiles.get(key)
+            if state is CLEARED:
+                continue
+            rect = self.tile_rect(*key)
+            if holes and any(_circle_overlap(rect, *hole) == INSIDE for hole in holes):
+                continue
+            dest = snap_to_screen(rect.left, rect.top, rect.right, rect.bottom, camera, scale)
+            if dest.width <= 0 or dest.height <= 0:
+                continue
+            if state is None:
+                blit_list.append((self._get_scaled_fogged(dest.size), dest.topleft))
+            else:
+                # Os tiles parciais são escalados todos de uma vez, em paralelo, mais abaixo
+                jobs.append((state, dest.size))
+                job_slots.append(len(blit_list))
+                blit_list.append((None, dest.topleft))
+        for slot, scaled in zip(job_slots, scale_pool.scale_many(jobs)):
+            blit_list[slot] = (scaled, blit_list[slot][1])
+        t = frame_profiler.stop('fog_scale', t)
+        if holes:
+            self._draw_with_holes(target, blit_list, camera, scale, holes)
+        else:
+            target.blits(blit_list, doreturn=False)
+        frame_profiler.stop('fog_blit', t)
+
+    def draw_textured(self, textures, camera, scale):
+        """Como draw sem revelações em curso; os tiles parciais são enviados como textura uma vez por versão."""
+        for key in self.tiles_in_rect(camera_render_rect(camera, self.map_rect)):
+            state = self.tile_state(key)
+            if state is CLEARED:
+                continue
+            rect = self.tile_rect(*key)
+            dest = snap_to_screen(rect.left, rect.top, rect.right, rect.bottom, camera, scale)
+            if dest.width <= 0 or dest.height <= 0:
+                continue
+            if state is None:
+                texture = textures.get('fogged', lambda: self.fogged_tile)
+            else:
+                texture = textures.get((key, self.version), lambda: state)
+            texture.draw(dstrect=dest)
+
+    def _draw_with_holes(self, target, blit_list, camera, scale, holes):
+        """Junta a névoa visível numa camada do tamanho do ecrã, recorta todos os círculos e desenha-a de uma vez."""
+        if self._hole_layer is None or self._hole_layer.get_size() != target.get_size():
+            self._hole_layer = pygame.Surface(target.get_size(), pygame.SRCALPHA)
+        layer = self._hole_layer
+        layer.fill((0, 0, 0, 0))
+        layer.blits(blit_list, doreturn=False)
+        screen_rect = layer.get_rect()
+        for x, y, radius in holes:
+            center = (round((x - camera.x) * scale), round((y - camera.y) * scale))
+            screen_radius = round(radius * scale)
+            overlap = _circle_overlap(screen_rect, center[0], center[1], screen_radius)
+            if overlap == INSIDE:
+                return # A revelação já cobre o ecrã todo
+            if overlap == EDGE:
+                # pygame.draw escreve o alfa 0 diretamente e recorta ao ecrã, mesmo com raios enormes
+                pygame.draw.circle(layer, (0, 0, 0, 0), center, screen_radius)
+        target.blit(layer, (0, 0))
+
+
+def _circle_overlap(rect, cx, cy, r):
+    """Diz se o círculo fica fora do retângulo, o atravessa (EDGE) ou o cobre por completo."""
+    # Distância ao ponto mais próximo e ao canto mais afastado do retângulo
+    near_x = min(max(cx, rect.left), rect.right - 1) - cx
+    near_y = min(max(cy, rect.top), rect.bottom - 1) - cy
+    if near_x * near_x + near_y * near_y > r * r:
+        return OUTSIDE
+    far_x = max(abs(cx - rect.left), abs(cx - (rect.right - 1)))
+    far_y = max(abs(cy - rect.top), abs(cy - (rect.bottom - 1)))
+    if far_x * far_x + far_y * far_y <= r * r:
+        return INSIDE
+    return EDGE
+
+
+def _uniform_color(surface):
+    """Devolve a cor RGBA se todos os pixels forem iguais, senão None."""
+    data = pygame.image.tobytes(surface, 'RGBA')
+    if data == data[:4] * (len(data) // 4):
+        return tuple(data[:4])
+    return None
@@ -0,0 +1,104 @@
+"""Atlas dos ícones dos POIs: todos os contornos e preenchimentos, já escalados, numa só imagem.
+
+Para gerar a partir dos pares '<id>_outline.png' / '<id>_fill.png' da pasta assets:
+
+    python icon_atlas.py
+
+O jogo usa o atlas se ele existir; ícones que não estejam lá continuam a ser
+lidos dos ficheiros soltos.
+"""
+import argparse
+import json
+import math
+import os
+import pygame
+
+ICON_ATLAS_VERSION = 1
+ICON_ATLAS_IMAGE = 'icon_atlas.png'
+ICON_ATLAS_INDEX = 'icon_atlas.json'
+ICON_ATLAS_ICON_SIZE = (64, 64) # Igual a POI_ICON_SIZE em main.py
+ICON_ATLAS_PAIRS_PER_ROW = 8 # Cada par ocupa duas células: contorno e, à direita, preenchimento
+
+
+# --- Leitura do Atlas ---
+class IconAtlas:
+    """Recorta os ícones de cada POI de uma única superfície já carregada."""
+
+    def __init__(self, image, index):
+        self.image = image
+        self.icon_size = tuple(index['icon_size'])
+        self.icons = index['icons'] # id -> [x, y] do contorno; o preenchimento está logo à direita
+
+    @staticmethod
+    def paths(folder):
+        return os.path.join(folder, ICON_ATLAS_IMAGE), os.path.join(folder, ICON_ATLAS_INDEX)
+
+    @staticmethod
+    def load_index(folder):
+        """Lê o índice do atlas, ou devolve None se não existir ou for de outra versão."""
+        index_path = IconAtlas.paths(folder)[1]
+        if not os.path.isfile(index_path):
+            return None
+        with open(index_path, encoding='utf-8') as f:
+            index = json.load(f)
+        return index if index.get('version') == ICON_ATLAS_VERSION else None
+
+    def get(self, poi_id, size):
+        """Devolve (contorno, preenchimento) no tamanho pedido, ou None se o POI não está no atlas."""
+        position = self.icons.get(poi_id)
+        if position is None:
+            return None
+        w, h = self.icon_size
+        x, y = position
+        outline = self.image.subsurface((x, y, w, h))
+        fill = self.image.subsurface((x + w, y, w, h))
+        if (w, h) != tuple(size):
+            outline, fill = pygame.transform.scale(outline, size), pygame.transform.scale(fill, size)
+        return outline, fill
+
+
+# --- Construção do Atlas ---
+def find_icon_ids(assets_dir):
+    """Ids com os dois ficheiros de ícone (contorno e preenchimento), por ordem alfabética."""
+    ids = []
+    for name in sorted(os.listdir(assets_dir)):
+        if name.endswith('_outline.png'):
+            poi_id = name[:-len('_outline.png')]
+            if os.path.isfile(os.path.join(assets_dir, f"{poi_id}_fill.png")):
+                ids.append(poi_id)
+    return ids
+
+
+def build_icon_atlas(assets_dir, out_dir=None, icon_size=ICON_ATLAS_ICON_SIZE):
+    """Escala cada par de ícones para 'icon_size' (como o jogo fazia ao carregar) e junta-os numa imagem."""
+    out_dir = out_dir or assets_dir
+    ids = find_icon_ids(assets_dir)
+    w, h = icon_size
+    columns = min(ICON_ATLAS_PAIRS_PER_ROW, max(1, len(ids)))
+    rows = max(1, math.ceil(len(ids) / columns))
+    atlas = pygame.Surface((columns * w * 2, rows * h), pygame.SRCALPHA)
+    index = {"version": ICON_ATLAS_VERSION, "icon_size": [w, h], "icons": {}}
+    for i, poi_id in enumerate(ids):
+        x, y = (i % columns) * w * 2, (i // columns) * h
+        for offset, kind in ((0, 'outline'), (w, 'fill')):
+            icon = pygame.image.load(os.path.join(assets_dir, f"{poi_id}_{kind}.png"))
+            atlas.blit(pygame.transform.scale(icon, icon_size), (x + offset, y))
+        index["icons"][poi_id] = [x, y]
+
+    os.makedirs(out_dir, exist_ok=True)
+    image_path, index_path = IconAtlas.paths(out_dir)
+    pygame.image.save(atlas, image_path)
+    with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(index_path + '.tmp', index_path)
+    print(f"{len(ids)} pares de ícones escritos em '{image_path}'.")
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Gera o atlas de ícones dos POIs do mapa interativo.")
+    parser.add_argument('--assets', default=os.path.join(base_path, 'assets'))
+    parser.add_argument('--out', help="Pasta de saída (por omissão, a própria pasta assets)")
+    parser.add_argument('--size', type=int, default=ICON_ATLAS_ICON_SIZE[0], help="Lado de cada ícone, em pixels")
+    args = parser.parse_args()
+    build_icon_atlas(args.assets, args.out, (args.size, args.size))
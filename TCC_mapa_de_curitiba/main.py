@@ -1,9 +1,26 @@
 import pygame
 import sys
 import math
-import random
 import os # Importa a biblioteca 'os' para lidar com caminhos de ficheiros
 import pygame.gfxdraw # Importa a biblioteca para desenho com anti-aliasing
+from map_pyramid import MapPyramid
+from fog import FogLayer
+from tile_cache import TileCache
+from tile_provider import TileProvider
+from spatial_index import PoiGrid, icon_pick_radius
+from poi_arrays import PoiArrays
+from tour_planner import TourPlanner
+from poi_search import PoiSearchIndex
+from poi_store import LruCache, open_poi_store
+from poi_icons import TintedIconCache, load_icon_pair
+from text_layout import render_text_block
+from profiler import frame_profiler, StartupReport
+from asset_loader import ParallelImageLoader
+from icon_atlas import IconAtlas
+from pan_cache import PanCache
+from minimap import Minimap
+from progress import default_progress_path, load_progress, save_progress
+from pontos_turisticos import PONTOS_TURISTICOS_DATA
 
 # --- FUNÇÃO AUXILIAR PARA LIDAR COM OS CAMINHOS DOS FICHEIROS ---
 def resource_path(relative_path):
@@ -17,15 +34,34 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+def to_display_format(surface, alpha=False):
+    """Converte para o formato do ecrã; no backend de texturas não há ecrã e a superfície fica como está."""
+    if not pygame.display.get_surface():
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
 # --- Configurações Iniciais ---
 SCREEN_WIDTH = 900
 SCREEN_HEIGHT = 720
+WINDOW_TITLE = "Mapa Interativo de Curitiba"
+RENDER_BACKEND = os.environ.get('MAPA_RENDERER', 'surface') # 'texture' ou 'software' usam texturas do SDL
 BACKGROUND_COLOR = (222, 220, 214) # Cor de fundo cinza claro, similar à da imagem
 FOG_COLOR_FALLBACK = (222, 220, 214, 240) # Cor sólida da névoa caso a imagem falhe
 WHITE = (255, 255, 255)
 GOLD = (255, 215, 0)
 BLACK = (0, 0, 0)
 POI_ICON_SIZE = (64, 64) # Tamanho padrão para os ícones no mapa
+POI_MAX_SHAKE = 10 # Deslocamento máximo (em pixels do ecrã) da animação de tremor
+POI_SHAKE_DURATION = 700 # ms de tremor antes de o POI ficar concluído
+POI_ICON_CACHE_SIZE = 256 # Pares de ícones (contorno + preenchimento) mantidos em memória
+CARD_IMAGE_CACHE_SIZE = 8 # Imagens de cartões mantidas em memória
+CARD_ANIM_SCALE_STEP = 0.02 # A animação do cartão reutiliza um frame por cada passo de escala
+SEARCH_BAR_WIDTH = 420 # Largura da caixa de pesquisa (Ctrl+F ou começar a escrever)
+SEARCH_ROW_HEIGHT = 32 # Altura de cada linha (campo e resultados) da caixa de pesquisa
+CAMERA_FLIGHT_DURATION = 900 # ms da viagem da câmara até um POI escolhido na pesquisa
+CAMERA_FLIGHT_WIDTH_FRACTION = 1 / 8 # Largura final da câmara na viagem, em fração da largura do mapa
+IDLE_WAIT_TIMEOUT = 500 # Sem nada a mudar, o ciclo dorme até haver input ou passar este tempo (ms)
+IDLE_WAIT_LOADING = 30 # Espera mais curta enquanto há tiles a carregar em segundo plano
 
 # --- Caminhos dos ficheiros agora incluem a pasta 'assets' ---
 ASSETS_FOLDER = 'assets'
@@ -34,6 +70,8 @@ FONT_TITLE_FILE = os.path.join(ASSETS_FOLDER, 'Rubik-Black.ttf')
 ICON_FILE = os.path.join(ASSETS_FOLDER, 'icone-araucaria.png')
 MAP_FILE = os.path.join(ASSETS_FOLDER, 'mapa_curitiba.png')
 FOG_IMAGE_FILE = os.path.join(ASSETS_FOLDER, 'fog.png') 
+TILE_CACHE_FOLDER = os.path.join(ASSETS_FOLDER, 'tile_cache') # Gerada com 'python tile_cache.py'
+POI_DATABASE_FILE = os.path.join(ASSETS_FOLDER, 'pois.sqlite') # Gerada com 'python poi_store.py'
 
 
 # --- Evento Personalizado para Revelar a Névoa ---
@@ -42,13 +80,14 @@ REVEAL_EVENT = pygame.USEREVENT + 1
 
 # --- Classe de Animação para Revelar a Névoa ---
 class RevealAnimation:
-    def __init__(self, fog_surface, map_pos, final_radius, duration=399):
-        self.fog_surface = fog_surface
+    def __init__(self, fog, map_pos, final_radius, duration=399):
+        self.fog = fog
         self.map_pos = map_pos
         self.final_radius = final_radius
         self.duration = duration
         self.start_time = pygame.time.get_ticks()
         self.is_finished = False
+        self.current_radius = 0 # Recortado no ecrã pela névoa; os tiles só mudam no fim
 
     def update(self):
         if self.is_finished:
@@ -56,127 +95,128 @@ class RevealAnimation:
         current_time = pygame.time.get_ticks()
         elapsed = current_time - self.start_time
         if elapsed >= self.duration:
-            x, y, r = int(self.map_pos.x), int(self.map_pos.y), int(self.final_radius)
-            pygame.gfxdraw.filled_circle(self.fog_surface, x, y, r, (0,0,0,0))
-            pygame.gfxdraw.aacircle(self.fog_surface, x, y, r, (0,0,0,0))
+            self.fog.clear_circle(self.map_pos, self.final_radius)
             self.is_finished = True
             return True
         else:
             t = elapsed / self.duration
             eased_t = 1 - pow(1 - t, 3)
-            current_radius = int(self.final_radius * eased_t)
-            x, y = int(self.map_pos.x), int(self.map_pos.y)
-            
-            pygame.gfxdraw.filled_circle(self.fog_surface, x, y, current_radius, (0,0,0,0))
-            pygame.gfxdraw.aacircle(self.fog_surface, x, y, current_radius, (0,0,0,0))
+            self.current_radius = int(self.final_radius * eased_t)
             return True
 
 
-# --- Dados dos Pontos Turísticos (Exemplos) ---
-PONTOS_TURISTICOS_DATA = [
-    { "id": "praca_tiradentes", "nome": "Praça Tiradentes", "pos": (8935, 5691), "descricao": "Localizada no coração do centro histórico de Curitiba, a Praça Tiradentes é um marco da cidade. É cercada por importantes edifícios históricos e é um ponto de encontro popular para eventos culturais e sociais. É a principal de Curitiba, dominada pela Catedral Basílica Menor de Nossa Senhora da Luz, centenária em 1993. Nesta região, em 29 de março de 1693, foi fundada Curitiba. Antigamente conhecida como Largo da Matriz, a praça é o marco zero da cidade. Em 1880, em função da visita do Imperador Pedro II ao Paraná, o Largo passou a se chamar D. Pedro II. Nove anos mais tarde, com a Proclamação da República, recebeu o nome atual de Praça Tiradentes. É um importante terminal de transporte coletivo.", "imagem_path": "" },
-    { "id": "rua_flores", "nome": "Rua das Flores", "pos": (9119, 5683), "descricao": "A Rua das Flores é uma charmosa rua de pedestres no centro de Curitiba, famosa por suas flores e árvores. É um ótimo lugar para passear, fazer compras e apreciar a arquitetura local.", "imagem_path": "" },
-    { "id": "rua_24_horas", "nome": "Rua 24 Horas", "pos": (8760, 5904), "descricao": "Uma rua coberta que funciona 24 horas por dia, oferecendo uma variedade de lojas, restaurantes e cafés. É um local popular tanto para moradores quanto para turistas.", "imagem_path": "" },
-    { "id": "museu_ferroviario", "nome": "Museu Ferroviário", "pos": (9178, 6029), "descricao": "O Museu Ferroviário de Curitiba é dedicado à história das ferrovias no Brasil. O museu abriga uma coleção de locomotivas, vagões e outros artefatos ferroviários, além de exposições sobre a história do transporte ferroviário.", "imagem_path": ""},
-    { "id": "teatro_paiol", "nome": "Teatro Paiol", "pos": (9481, 6451), "descricao": "Localizado em um antigo paiol de pólvora, o Teatro Paiol é um espaço cultural que abriga peças de teatro, shows e eventos culturais. É conhecido por sua acústica excepcional e ambiente intimista.", "imagem_path": "" },
-    { "id": "jardim_botanico", "nome": "Jardim Botânico", "pos": (10225, 6227), "descricao": "O Jardim Botânico de Curitiba, inaugurado em 1991, é um dos principais pontos turísticos da cidade. A sua estufa de metal e vidro, inspirada no Palácio de Cristal de Londres, é o seu marco mais famoso e abriga espécies botânicas da Floresta Atlântica.", "imagem_path": "" },
-    { "id": "mercado_municipal", "nome": "Mercado Municipal", "pos": (9503, 5909), "descricao": "O Mercado Municipal de Curitiba é um local vibrante onde você pode encontrar uma variedade de produtos frescos, especiarias, artesanato e comidas típicas. É um ótimo lugar para experimentar a culinária local e comprar lembranças.", "imagem_path": "" },
-    { "id": "teatro_guaira", "nome": "Teatro Guaíra", "pos": (9190, 5637), "descricao": "Um dos principais teatros do Brasil, o Teatro Guaíra é conhecido por sua arquitetura imponente e por abrigar uma variedade de eventos culturais, incluindo óperas, balés e concertos. É um símbolo da vida cultural de Curitiba.", "imagem_path": "" },
-    { "id": "palacio_liberdade", "nome": "Paço da Liberdade", "pos": (9010, 5701), "descricao": "O Palácio da Liberdade é a sede do governo do estado do Paraná. Sua arquitetura neoclássica e os jardins bem cuidados fazem dele um local de visitação popular, especialmente durante eventos culturais e exposições.", "imagem_path": "" },
-    { "id": "passeio_publico", "nome": "Passeio Público", "pos": (9108, 5512), "descricao": "O Passeio Público é um dos parques mais antigos de Curitiba, inaugurado em 1886. É um espaço verde com lagos, pontes e áreas para piqueniques, ideal para relaxar e apreciar a natureza no coração da cidade.", "imagem_path": "" },
-    { "id": "centro_civico", "nome": "Centro Cívico", "pos": (9048, 5169), "descricao": "O Centro Cívico é o coração político de Curitiba, onde estão localizados o Palácio Iguaçu, a Assembleia Legislativa e outros edifícios governamentais. É um local importante para eventos cívicos e manifestações.", "imagem_path": "" },
-    { "id": "museu_olho", "nome": "Museu Oscar Niemeyer", "pos": (9111, 4876), "descricao": "Popularmente conhecido como Museu do Olho, devido ao design de sua torre, é um espaço dedicado à exposição de Artes Visuais, Arquitetura e Design. Projetado por Oscar Niemeyer, é um dos maiores complexos de exposição da América Latina.", "imagem_path": "" },     
-    { "id": "bosque_papa", "nome": "Bosque do Papa", "pos": (9000, 4792), "descricao": "Um parque dedicado ao Papa João Paulo II, com uma trilha de caminhada, lago e áreas para piqueniques. É um local tranquilo para relaxar e apreciar a natureza, além de abrigar uma réplica da Capela de São Miguel.", "imagem_path": "" },
-    { "id": "bosque_alemao", "nome": "Bosque Alemão", "pos": (8332, 4646), "descricao": "Um parque temático que celebra a cultura alemã em Curitiba. Possui uma trilha de caminhada, um mirante e uma réplica de uma casa típica alemã. É um ótimo lugar para aprender sobre a história da imigração alemã na região.", "imagem_path": "" },
-    { "id": "universidade_meio_ambiente", "nome": "UNILIVRE", "pos": (8492, 4335), "descricao": "Um espaço educacional dedicado à preservação ambiental e sustentabilidade. Oferece cursos, palestras e atividades voltadas para a conscientização ambiental, além de um belo jardim botânico.", "imagem_path": "" },
-    { "id": "parque_lourenco", "nome": "Parque São Lourenço", "pos": (9123, 3710), "descricao": "Um parque urbano com áreas verdes, lago e trilhas para caminhada. É um local popular para atividades ao ar livre, como caminhadas, corridas e piqueniques, além de abrigar eventos culturais e esportivos.", "imagem_path": "" },
-    { "id": "opera_arame", "nome": "Ópera de Arame", "pos": (8760, 3816), "descricao": "Com uma estrutura tubular de aço e teto transparente, a Ópera de Arame é um dos espaços de espetáculos mais emblemáticos do Brasil. Foi construída em apenas 75 dias e inaugurada em 1992, em meio a um lago e vegetação nativa.", "imagem_path": "" },
-    { "id": "parque_tangua", "nome": "Parque Tanguá", "pos": (8548, 3593), "descricao": "Um parque urbano com lago, cascata e mirante. É um local popular para caminhadas, corridas e piqueniques, além de oferecer vistas panorâmicas da cidade.", "imagem_path": "" },
-    { "id": "parque_tingui", "nome": "Parque Tingui", "pos": (7648, 4204), "descricao": "Um parque urbano com áreas verdes, lago e trilhas para caminhada. É um local popular para atividades ao ar livre, como caminhadas, corridas e piqueniques, além de abrigar eventos culturais e esportivos.", "imagem_path": "" },
-    { "id": "memorial_ucraniano", "nome": "Memorial Ucraniano", "pos": (7678, 4545), "descricao": "Um espaço cultural dedicado à preservação da cultura ucraniana em Curitiba. O memorial abriga uma capela, um museu e um centro cultural, além de eventos e festivais que celebram a cultura ucraniana.", "imagem_path": "" },
-    { "id": "portal_italiano", "nome": "Portal Italiano", "pos": (7747, 5079), "descricao": "Um monumento que celebra a imigração italiana em Curitiba. O portal é uma réplica de uma construção típica italiana e é um local popular para fotos e eventos culturais.", "imagem_path": "" },
-    { "id": "santa_felicidade", "nome": "Santa Felicidade", "pos": (6588, 4495), "descricao": "Um bairro tradicional de Curitiba, conhecido por sua forte influência italiana. É famoso por seus restaurantes, vinícolas e lojas de artesanato, além de ser um ótimo lugar para experimentar a culinária italiana.", "imagem_path": "" },
-    { "id": "parque_barigui", "nome": "Parque Barigui", "pos": (7605, 5549), "descricao": "Um dos maiores parques urbanos de Curitiba, o Parque Barigui é um local popular para caminhadas, corridas e piqueniques. Possui um lago, áreas verdes e uma pista de caminhada ao redor do parque.", "imagem_path": "" },
-    { "id": "torre_panoramica", "nome": "Torre Panorâmica", "pos": (8099, 5482), "descricao": "Uma torre de observação que oferece vistas panorâmicas da cidade. É um local popular para turistas e moradores, especialmente ao pôr do sol.", "imagem_path": "" },
-    { "id": "centro_historico", "nome": "Centro Histórico", "pos": (8930, 5590), "descricao": "O Centro Histórico de Curitiba é uma área que preserva a arquitetura colonial e a história da cidade. É um local popular para passeios a pé, com várias lojas, restaurantes e museus.", "imagem_path": "" },
-]
-
-
 # --- Classe para o Ponto Turístico (POI) ---
 class POI(pygame.sprite.Sprite):
-    def __init__(self, data, index, outline_img, fill_img, is_initial=False):
+    """Vista sobre a linha 'row' de PoiArrays: as flags e o tremor vivem nos arrays, partilhados por todos."""
+    shake_duration = POI_SHAKE_DURATION
+
+    def __init__(self, data, index, row, arrays, store, icon_cache, is_initial=False):
         super().__init__()
         self.id = data["id"]
         self.nome = data["nome"]
         self.map_pos = pygame.math.Vector2(data["pos"])
-        self.descricao = data["descricao"]
-        self.imagem_path = data["imagem_path"]
         self.index = index
+        self.row = row
+        self.arrays = arrays
         
-        self.outline_img = outline_img
-        self.fill_img_original = fill_img
-        
-        if self.outline_img:
-            self.image = self.outline_img.copy()
-            self.rect = self.image.get_rect()
-            self.use_custom_icon = True
-        else:
-            self.use_custom_icon = False
-            self.radius = 15
-            self.rect = pygame.Rect(0, 0, self.radius * 2, self.radius * 2)
+        # Descrição, imagem e ícones só são lidos quando o POI aparece ou o cartão abre
+        self.store = store
+        self.icon_cache = icon_cache
+        self.radius = 15
+        self._has_icon = None # Só se procura o ícone uma vez; sem ele a cache guardaria entradas vazias
 
         self.is_visible = is_initial
-        self.is_completed = False
-        self.is_shaking = False
-        self.shake_start_time = 0
-        self.shake_duration = 700
-        self.shake_magnitude = 0
-        
-        self.fill_color = GOLD
-
-    def update(self, screen_pos):
-        current_time = pygame.time.get_ticks()
-        if self.is_shaking:
-            elapsed_time = current_time - self.shake_start_time
-            if elapsed_time < self.shake_duration:
-                self.shake_magnitude = (elapsed_time / self.shake_duration) * 10
-                offset_x = random.uniform(-self.shake_magnitude, self.shake_magnitude)
-                self.rect.center = (screen_pos[0] + offset_x, screen_pos[1])
-            else:
-                self.is_shaking = False
-                self.shake_magnitude = 0
-                self.is_completed = True
-                self.fill_color = WHITE 
-                self.rect.center = screen_pos
-                reveal_event = pygame.event.Event(REVEAL_EVENT, {"pos": self.map_pos, "index": self.index})
-                pygame.event.post(reveal_event)
-        else:
-             self.rect.center = screen_pos
-
-    def draw(self, surface):
-        if self.is_visible:
-            if self.use_custom_icon:
-                colored_fill = self.fill_img_original.copy()
-                colored_fill.fill(self.fill_color, special_flags=pygame.BLEND_RGB_MULT)
-                surface.blit(colored_fill, self.rect)
-                surface.blit(self.outline_img, self.rect)
-            else: 
-                center_x, center_y = int(self.rect.centerx), int(self.rect.centery)
-                pygame.gfxdraw.filled_circle(surface, center_x, center_y, self.radius, BLACK)
-                pygame.gfxdraw.aacircle(surface, center_x, center_y, self.radius, BLACK)
-                pygame.gfxdraw.filled_circle(surface, center_x, center_y, self.radius - 2, self.fill_color)
-                pygame.gfxdraw.aacircle(surface, center_x, center_y, self.radius - 2, self.fill_color)
 
+    @property
+    def is_visible(self):
+        return bool(self.arrays.visible[self.row])
+
+    @is_visible.setter
+    def is_visible(self, value):
+        self.arrays.visible[self.row] = value
+
+    @property
+    def is_completed(self):
+        return bool(self.arrays.completed[self.row])
+
+    @is_completed.setter
+    def is_completed(self, value):
+        self.arrays.completed[self.row] = value
+
+    @property
+    def is_shaking(self):
+        return bool(self.arrays.shaking[self.row])
+
+    @property
+    def shake_magnitude(self):
+        return float(self.arrays.shake_magnitude[self.row])
+
+    @property
+    def rect(self):
+        """Rect no ecrã na posição (com tremor) calculada no último update_all."""
+        rect = pygame.Rect((0, 0), POI_ICON_SIZE if self.use_custom_icon else (self.radius * 2, self.radius * 2))
+        rect.center = self.arrays.screen_pos[self.row].tolist()
+        return rect
+
+    @property
+    def fill_color(self):
+        return WHITE if self.is_completed else GOLD
+
+    @property
+    def descricao(self):
+        return self.store.description(self.id)
+
+    @property
+    def imagem_path(self):
+        return self.store.image_path(self.id)
+
+    @property
+    def outline_img(self):
+        return self.icon_cache.get(self.id)[0]
+
+    @property
+    def use_custom_icon(self):
+        if self._has_icon is None:
+            self._has_icon = self.outline_img is not None
+        return self._has_icon
+
+    def blit_items(self, tinted_icons):
+        """Devolve os pares (superfície, posição) a desenhar, para juntar num único Surface.blits."""
+        if not self.is_visible:
+            return ()
+        rect = self.rect
+        if self.use_custom_icon:
+            return ((tinted_icons.fill(self.id, self.fill_color, POI_ICON_SIZE), rect),
+                    (tinted_icons.outline(self.id, POI_ICON_SIZE), rect))
+        center_x, center_y = int(rect.centerx), int(rect.centery)
+        return ((tinted_icons.circle(self.fill_color, self.radius), (center_x - self.radius, center_y - self.radius)),)
 
     def start_shake_animation(self):
         if not self.is_shaking and not self.is_completed:
-            self.is_shaking = True
-            self.shake_start_time = pygame.time.get_ticks()
+            self.arrays.shaking[self.row] = True
+            self.arrays.shake_start[self.row] = pygame.time.get_ticks()
+
+def load_card_image(poi, body_font):
+    """Carrega a imagem do cartão já no tamanho final, ou um marcador com o nome do POI."""
+    try:
+        if poi.imagem_path:
+            image_path = resource_path(os.path.join(ASSETS_FOLDER, poi.imagem_path))
+            image = to_display_format(pygame.image.load(image_path))
+        else:
+            raise pygame.error("No image path provided")
+    except (pygame.error, FileNotFoundError):
+        image = pygame.Surface((400, 200)); image.fill((50, 50, 50))
+        img_text = body_font.render(f"Imagem de {poi.nome}", True, WHITE)
+        img_text_rect = img_text.get_rect(center=image.get_rect().center)
+        image.blit(img_text, img_text_rect)
+
+    return pygame.transform.scale(image, (400, 200))
 
 # --- Classe para o Cartão de Informações ---
 class InfoCard:
-    def __init__(self, poi, title_font, body_font, screen_size):
+    def __init__(self, poi, title_font, body_font, screen_size, card_image=None):
         self.poi = poi
+        self.card_image = card_image
         self.title_font = title_font
         self.body_font = body_font
         
@@ -186,13 +226,17 @@ class InfoCard:
         self.fade_anim_duration = 70
         
         self.final_rect = pygame.Rect(0, 0, 500, 550)
-        self.base_surface = pygame.Surface(self.final_rect.size, pygame.SRCALPHA).convert_alpha()
+        self.base_surface = to_display_format(pygame.Surface(self.final_rect.size, pygame.SRCALPHA), alpha=True)
         
         self.button_color = GOLD
         self.button_rect_on_card = pygame.Rect(0, 0, 150, 50)
         self.button_rect_on_card.centerx = self.final_rect.width // 2
         self.button_rect_on_card.bottom = self.final_rect.height - 20
         self.button_screen_rect = self.button_rect_on_card.copy()
+        self.button_text = self.body_font.render("Concluído", True, BLACK)
+        self._composite = None
+        self._composite_key = None
+        self._scaled_frames = {}
 
         self.scroll_y = 0
         self.desc_viewport_rect = pygame.Rect(30, 300, self.final_rect.width - 60, 180)
@@ -202,41 +246,10 @@ class InfoCard:
         self.pre_render_card_content()
     
     def _create_text_surface(self):
-        """Cria uma superfície grande com todo o texto da descrição."""
-        lines = self.wrap_text(self.poi.descricao, self.body_font, self.desc_viewport_rect.width)
-        
-        if not lines:
-            self.full_text_surface = pygame.Surface((1,1))
-            self.max_scroll = 0
-            return
-
-        line_height = self.body_font.get_linesize()
-        total_height = len(lines) * line_height
-        
-        self.full_text_surface = pygame.Surface((self.desc_viewport_rect.width, total_height), pygame.SRCALPHA)
-        
-        y = 0
-        for line in lines:
-            line_surface = self.body_font.render(line, True, WHITE)
-            self.full_text_surface.blit(line_surface, (0, y))
-            y += line_height
-            
-        self.max_scroll = max(0, total_height - self.desc_viewport_rect.height)
-
-    def wrap_text(self, text, font, max_width):
-        """Função auxiliar para quebrar o texto em linhas."""
-        words = text.split(' ')
-        lines = []
-        current_line = ""
-        for word in words:
-            test_line = current_line + word + " "
-            if font.size(test_line)[0] < max_width:
-                current_line = test_line
-            else:
-                lines.append(current_line.strip())
-                current_line = word + " "
-        lines.append(current_line.strip())
-        return lines
+        """Obtém a superfície com todo o texto da descrição (reutilizada entre aberturas do cartão)."""
+        self.full_text_surface = render_text_block(self.poi.id, self.poi.descricao, self.body_font,
+                                                   self.desc_viewport_rect.width, WHITE)
+        self.max_scroll = max(0, self.full_text_surface.get_height() - self.desc_viewport_rect.height)
 
     def update_position(self, screen_size):
         self.final_rect.center = (screen_size[0] // 2, screen_size[1] // 2)
@@ -257,25 +270,13 @@ class InfoCard:
         title_text = self.title_font.render(self.poi.nome, True, WHITE)
         title_rect = title_text.get_rect(centerx=self.base_surface.get_width() // 2, top=20)
         self.base_surface.blit(title_text, title_rect)
-        try:
-            if self.poi.imagem_path:
-                image_path = resource_path(os.path.join(ASSETS_FOLDER, self.poi.imagem_path))
-                image = pygame.image.load(image_path).convert()
-            else:
-                raise pygame.error("No image path provided")
-        except (pygame.error, FileNotFoundError):
-            image = pygame.Surface((400, 200)); image.fill((50, 50, 50))
-            img_text = self.body_font.render(f"Imagem de {self.poi.nome}", True, WHITE)
-            img_text_rect = img_text.get_rect(center=image.get_rect().center)
-            image.blit(img_text, img_text_rect)
-
-        image = pygame.transform.scale(image, (400, 200))
+        image = self.card_image or load_card_image(self.poi, self.body_font)
         image_rect = image.get_rect(centerx=self.base_surface.get_width() // 2, top=title_rect.bottom + 15)
         self.base_surface.blit(image, image_rect)
 
-    def handle_scroll(self, event):
+    def handle_scroll(self, event, mouse_pos):
         """Processa o scroll da roda do rato para o texto."""
-        if self.final_rect.collidepoint(pygame.mouse.get_pos()):
+        if self.final_rect.collidepoint(mouse_pos):
             self.scroll_y -= event.y * 20 # Multiplicador para velocidade do scroll
             self.scroll_y = max(0, min(self.scroll_y, self.max_scroll))
 
@@ -286,7 +287,8 @@ class InfoCard:
             else:
                 self.button_color = GOLD
 
-    def draw(self, screen):
+    def animation_frame(self):
+        """Escala e alfa do cartão neste frame; passa a 'idle' quando a animação de entrada acaba."""
         elapsed_time = pygame.time.get_ticks() - self.animation_start_time
         
         if self.state == 'appearing':
@@ -306,39 +308,169 @@ class InfoCard:
         else: # idle
             current_scale = 1.0
             current_alpha = 255
+        return current_scale, current_alpha
+
+    def draw(self, screen):
+        current_scale, current_alpha = self.animation_frame()
+        frame = self._get_frame(current_scale)
+        frame.set_alpha(int(current_alpha))
+        screen.blit(frame, frame.get_rect(center=self.final_rect.center))
+
+    def draw_textured(self, textures):
+        """Como draw, mas a escala e o fade são parâmetros da textura (enviada só quando o cartão muda)."""
+        current_scale, current_alpha = self.animation_frame()
+        composite = self._get_composite()
+        texture = textures.get(composite, lambda: composite)
+        texture.alpha = int(current_alpha)
+        rect = pygame.Rect(0, 0, round(self.final_rect.width * current_scale), round(self.final_rect.height * current_scale))
+        rect.center = self.final_rect.center
+        texture.draw(dstrect=rect)
+
+    def _get_composite(self):
+        """Cartão montado (base, texto e botão); só é refeito quando o scroll ou o botão mudam."""
+        key = (self.scroll_y, self.button_color)
+        if self._composite_key != key:
+            composite = self.base_surface.copy()
+            text_viewport = composite.subsurface(self.desc_viewport_rect)
+            text_viewport.blit(self.full_text_surface, (0, -self.scroll_y))
+            pygame.draw.rect(composite, self.button_color, self.button_rect_on_card, border_radius=40)
+            button_text_rect = self.button_text.get_rect(center=self.button_rect_on_card.center)
+            composite.blit(self.button_text, button_text_rect)
+            self._composite = composite
+            self._composite_key = key
+            self._scaled_frames = {}
+        return self._composite
+
+    def _get_frame(self, scale):
+        """Devolve o cartão na escala pedida, arredondada a CARD_ANIM_SCALE_STEP e guardada para reutilizar."""
+        composite = self._get_composite()
+        step = round(scale / CARD_ANIM_SCALE_STEP)
+        if step == round(1.0 / CARD_ANIM_SCALE_STEP):
+            return composite
+        frame = self._scaled_frames.get(step)
+        if frame is None:
+            frame_scale = step * CARD_ANIM_SCALE_STEP
+            size = (int(self.final_rect.width * frame_scale), int(self.final_rect.height * frame_scale))
+            frame = pygame.transform.scale(composite, size)
+            self._scaled_frames[step] = frame
+        return frame
+
+# --- Caixa de Pesquisa dos POIs ---
+class SearchBar:
+    """Campo de texto no topo do ecrã com os POIs que correspondem ao que já foi escrito."""
+
+    def __init__(self, index, poi_list, font, screen_size, query=''):
+        self.index = index
+        self.poi_list = poi_list
+        self.font = font
+        self.rect = pygame.Rect(0, 10, SEARCH_BAR_WIDTH, SEARCH_ROW_HEIGHT)
+        self.update_position(screen_size)
+        self.selected = 0
+        self._surface = None # Refeita só quando o texto ou a seleção mudam
+        self.set_query(query)
+
+    def update_position(self, screen_size):
+        self.rect.centerx = screen_size[0] // 2
+
+    def set_query(self, query):
+        self.query = query
+        self.results = self.index.search(query) # Linhas dos POIs
+        self.selected = 0
+        self._surface = None
+        self.rect.height = SEARCH_ROW_HEIGHT * (1 + len(self.results))
+
+    def move_selection(self, step):
+        if self.results:
+            self.selected = (self.selected + step) % len(self.results)
+            self._surface = None
+
+    def result_at(self, screen_pos):
+        """Linha do POI do resultado sob o ponto do ecrã, ou None."""
+        if not self.rect.collidepoint(screen_pos):
+            return None
+        i = (screen_pos[1] - self.rect.top) // SEARCH_ROW_HEIGHT - 1
+        return self.results[i] if 0 <= i < len(self.results) else None
+
+    def handle_event(self, event):
+        """Trata a tecla ou o texto; devolve 'close', a linha do POI escolhido, ou None."""
+        if event.type == pygame.TEXTINPUT:
+            self.set_query(self.query + event.text)
+        elif event.key == pygame.K_ESCAPE:
+            return 'close'
+        elif event.key == pygame.K_BACKSPACE:
+            self.set_query(self.query[:-1])
+        elif event.key == pygame.K_DOWN:
+            self.move_selection(1)
+        elif event.key == pygame.K_UP:
+            self.move_selection(-1)
+        elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER) and self.results:
+            return self.results[self.selected]
+        return None
+
+    def surface(self):
+        if self._surface is None:
+            surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            pygame.draw.rect(surface, (7, 7, 9, 230), surface.get_rect(), border_radius=12)
+            text = self.font.render(self.query + "|", True, WHITE)
+            surface.blit(text, text.get_rect(left=12, centery=SEARCH_ROW_HEIGHT // 2))
+            for i, row in enumerate(self.results):
+                row_rect = pygame.Rect(0, SEARCH_ROW_HEIGHT * (i + 1), self.rect.width, SEARCH_ROW_HEIGHT)
+                if i == self.selected:
+                    pygame.draw.rect(surface, GOLD, row_rect.inflate(-8, -4), border_radius=8)
+                name = self.font.render(self.poi_list[row].nome, True, BLACK if i == self.selected else WHITE)
+                surface.blit(name, name.get_rect(left=20, centery=row_rect.centery))
+            self._surface = to_display_format(surface, alpha=True)
+        return self._surface
+
+    def draw(self, screen):
+        screen.blit(self.surface(), self.rect)
+
+
+# --- Viagem da Câmara até um POI ---
+class CameraFlight:
+    """Interpola o centro (linear) e a largura (geométrica) da câmara, com easing, até ao destino."""
+
+    def __init__(self, camera, target_center, target_width, duration=CAMERA_FLIGHT_DURATION):
+        self.start_center = pygame.math.Vector2(camera.center)
+        self.target_center = pygame.math.Vector2(target_center)
+        self.start_width = camera.width
+        self.target_width = target_width
+        self.duration = duration
+        self.start_time = pygame.time.get_ticks()
+        self.is_finished = False
+
+    def update(self):
+        """Devolve (centro, largura) da câmara neste frame."""
+        t = min((pygame.time.get_ticks() - self.start_time) / self.duration, 1.0)
+        self.is_finished = t >= 1.0
+        eased_t = 1 - pow(1 - t, 3)
+        center = self.start_center.lerp(self.target_center, eased_t)
+        width = self.start_width * (self.target_width / self.start_width) ** eased_t
+        return center, width
 
-        current_width = self.final_rect.width * current_scale
-        current_height = self.final_rect.height * current_scale
-        
-        final_surface = self.base_surface.copy()
-        
-        text_viewport = final_surface.subsurface(self.desc_viewport_rect)
-        text_viewport.blit(self.full_text_surface, (0, -self.scroll_y))
-        
-        pygame.draw.rect(final_surface, self.button_color, self.button_rect_on_card, border_radius=40)
-        button_text = self.body_font.render("Concluído", True, BLACK)
-        button_text_rect = button_text.get_rect(center=self.button_rect_on_card.center)
-        final_surface.blit(button_text, button_text_rect)
-        
-        final_surface.set_alpha(int(current_alpha))
-        
-        scaled_surface = pygame.transform.scale(final_surface, (int(current_width), int(current_height)))
-        scaled_rect = scaled_surface.get_rect(center=self.final_rect.center)
-        screen.blit(scaled_surface, scaled_rect)
 
 # --- Classe Principal do Jogo ---
 class Game:
-    def __init__(self):
+    def __init__(self, map_image=None, poi_store=None, progress_path=None, render_backend=None):
+        """'map_image' e 'poi_store' substituem os ficheiros do jogo (usado pelo benchmark).
+
+        'render_backend' é 'surface' (blits por software), 'texture' ou 'software' (ver texture_renderer.py).
+        """
+        self.startup = StartupReport() # Impresso depois do primeiro frame
         pygame.init()
         self.screen_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
-        self.screen = pygame.display.set_mode(self.screen_size, pygame.RESIZABLE)
-        pygame.display.set_caption("Mapa Interativo de Curitiba")
-        try:
-            icon_path = resource_path(ICON_FILE)
-            icon_image = pygame.image.load(icon_path)
-            pygame.display.set_icon(icon_image)
-        except pygame.error as e:
-            print(f"Não foi possível carregar o ícone: {e}")
+        self.textures = self._open_texture_renderer(render_backend or RENDER_BACKEND)
+        if self.textures is None:
+            self.screen = pygame.display.set_mode(self.screen_size, pygame.RESIZABLE)
+            pygame.display.set_caption(WINDOW_TITLE)
+        else:
+            self.screen = None
+        self.startup.mark("janela")
+
+        # Ícone da janela, mapa, névoa e atlas são descodificados em threads enquanto as fontes carregam
+        loader = ParallelImageLoader()
+        loader.submit('window_icon', resource_path(ICON_FILE))
+        atlas_index = self._submit_asset_decoding(loader, map_image)
         self.clock = pygame.time.Clock()
         
         try:
@@ -350,54 +482,147 @@ class Game:
             print(f"Erro ao carregar fontes personalizadas: {e}. A usar fontes padrão.")
             self.font_card_title = pygame.font.SysFont('arial', 32, bold=True)
             self.font_card_body = pygame.font.SysFont('arial', 20)
-
-        self._load_poi_icons() 
+        self.font_hud = pygame.font.Font(None, 20) # Fonte embutida do pygame, para o HUD de desempenho (F3)
+        self.startup.mark("fontes")
 
         try:
-            map_path = resource_path(MAP_FILE)
-            self.map_image_original = pygame.image.load(map_path).convert()
-        except pygame.error as e:
-            print(f"Erro: Não foi possível carregar 'mapa_curitiba.png'. {e}")
-            self.map_image_original = pygame.Surface((16761, 16910)); self.map_image_original.fill((100,100,100))
-        
-        self.map_full_rect = self.map_image_original.get_rect()
-        
-        try:
-            fog_path = resource_path(FOG_IMAGE_FILE)
-            self.fog_surface = pygame.image.load(fog_path).convert_alpha()
-        except pygame.error:
-            print(f"Não foi possível carregar '{FOG_IMAGE_FILE}'. A usar névoa sólida de fallback.")
-            self.fog_surface = pygame.Surface(self.map_full_rect.size, pygame.SRCALPHA)
-            self.fog_surface.fill(FOG_COLOR_FALLBACK)
+            window_icon = loader.result('window_icon')
+            if self.textures is None:
+                pygame.display.set_icon(window_icon)
+            else:
+                self.textures.set_icon(window_icon)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Não foi possível carregar o ícone: {e}")
+        self.icon_atlas = self._load_icon_atlas(loader, atlas_index)
+        self.icon_cache = LruCache(POI_ICON_CACHE_SIZE, self._load_poi_icon)
+        self.tinted_icons = TintedIconCache(self.icon_cache)
+        self.card_images = LruCache(CARD_IMAGE_CACHE_SIZE, lambda poi: load_card_image(poi, self.font_card_body))
+        self._load_map_and_fog(map_image, loader)
+        loader.close()
+        self.startup.mark("mapa e névoa")
         
+        self.pan_cache = PanCache(BACKGROUND_COLOR)
         self.reveal_animations = []
         self.is_dragging = False
         self.clicked_on_poi = None 
+        self.mouse_pos = pygame.mouse.get_pos() # Última posição conhecida pelos eventos
 
         self.camera = pygame.Rect(0, 0, 0, 0)
         self.recalculate_camera_aspect() 
+        self.last_camera_pos = self.camera.topleft
+        self.camera_velocity = (0, 0) # Em pixels do mapa por frame, suavizada
+
+        # Estado do último frame desenhado, para o modo de espera saber se é preciso redesenhar
+        self.needs_redraw = True
+        self.last_drawn_camera = None
+        self.last_tiles_completed = 0
 
         self.pois = pygame.sprite.Group()
+        self.poi_index = PoiGrid() # Cliques e revelações; o recorte por frame é feito em self.poi_arrays
+        self.poi_list = [] # POI da linha i de self.poi_arrays
+        self.visible_rows = [] # Linhas dos POIs visíveis dentro da câmara, recortadas em update_all
         self.active_card = None
-        self._setup_pois()
-
-    def _load_poi_icons(self):
-        self.poi_outline_images = {}
-        self.poi_fill_images = {}
-        print("A carregar ícones dos POIs...")
-        for poi_data in PONTOS_TURISTICOS_DATA:
-            poi_id = poi_data["id"]
+        self.search_index = None # Construído na primeira pesquisa
+        self.search_bar = None
+        self.camera_flight = None
+        self._setup_pois(poi_store)
+        self.startup.mark("POIs")
+
+        # Progresso gravado entre sessões (None desliga, por exemplo no benchmark)
+        self.progress_path = progress_path
+        self.reveal_circles = [] # (x, y, raio) de cada revelação, pela ordem em que aconteceram
+        if progress_path:
+            self._restore_progress()
+            self.startup.mark("progresso")
+
+        # Minimapa no canto: miniatura do mapa já reduzida e névoa atualizada a cada revelação
+        self.minimap = Minimap(self.map_source.thumbnail(), self.fog, self.screen_size, self.reveal_circles)
+        self.minimap_dragging = False
+        self.startup.mark("minimapa")
+
+    def _open_texture_renderer(self, backend):
+        """Cria a janela do backend de texturas, ou devolve None para usar os blits por software."""
+        if backend not in ('texture', 'software'):
+            return None
+        try:
+            from texture_renderer import TextureRenderer
+            return TextureRenderer(WINDOW_TITLE, self.screen_size, BACKGROUND_COLOR, software=backend == 'software')
+        except (ImportError, RuntimeError, pygame.error) as e:
+            print(f"Backend de texturas indisponível ({e}). A usar o desenho por software.")
+            return None
+
+    def _submit_asset_decoding(self, loader, map_image=None):
+        """Põe a descodificar as imagens grandes que o arranque vai precisar; devolve o índice do atlas."""
+        if map_image is None and not TileCache.exists(resource_path(TILE_CACHE_FOLDER)):
+            loader.submit('map', resource_path(MAP_FILE))
+            loader.submit('fog', resource_path(FOG_IMAGE_FILE))
+        assets_dir = resource_path(ASSETS_FOLDER)
+        try:
+            atlas_index = IconAtlas.load_index(assets_dir)
+        except (OSError, ValueError) as e:
+            print(f"Índice do atlas de ícones inválido ({e}). A usar os ficheiros soltos.")
+            atlas_index = None
+        if atlas_index is not None:
+            loader.submit('atlas', IconAtlas.paths(assets_dir)[0])
+        return atlas_index
+
+    def _load_icon_atlas(self, loader, atlas_index):
+        if atlas_index is None:
+            return None
+        try:
+            return IconAtlas(to_display_format(loader.result('atlas'), alpha=True), atlas_index)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Não foi possível carregar o atlas de ícones ({e}). A usar os ficheiros soltos.")
+            return None
+
+    def _load_map_and_fog(self, map_image=None, loader=None):
+        """Usa a cache de tiles se existir; senão descodifica as imagens completas."""
+        self.tile_provider = None
+        if map_image is not None:
+            self.map_full_rect = map_image.get_rect()
+            self.map_source = MapPyramid(to_display_format(map_image))
+            self.fog = FogLayer(self.map_full_rect.size, FOG_COLOR_FALLBACK)
+            return
+
+        cache_dir = resource_path(TILE_CACHE_FOLDER)
+        if TileCache.exists(cache_dir):
             try:
-                outline_path = resource_path(os.path.join(ASSETS_FOLDER, f"{poi_id}_outline.png"))
-                fill_path = resource_path(os.path.join(ASSETS_FOLDER, f"{poi_id}_fill.png"))
-                outline_img = pygame.image.load(outline_path).convert_alpha()
-                fill_img = pygame.image.load(fill_path).convert_alpha()
-                self.poi_outline_images[poi_id] = pygame.transform.scale(outline_img, POI_ICON_SIZE)
-                self.poi_fill_images[poi_id] = pygame.transform.scale(fill_img, POI_ICON_SIZE)
-            except pygame.error:
-                print(f"Aviso: Ícone para '{poi_id}' não encontrado. A usar círculo como fallback.")
-                self.poi_outline_images[poi_id] = None
-                self.poi_fill_images[poi_id] = None
+                tile_cache = TileCache(cache_dir)
+                # Os tiles são lidos em background para que arrastar o mapa nunca espere pelo disco
+                self.tile_provider = TileProvider(tile_cache)
+                self.map_source = self.tile_provider
+                self.map_full_rect = tile_cache.map_rect.copy()
+                self.fog = tile_cache.load_fog(FOG_COLOR_FALLBACK)
+                return
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Cache de tiles inválida ({e}). A carregar as imagens completas.")
+
+        # Normalmente já foram pedidas em _submit_asset_decoding; só não o foram se a cache de tiles falhou
+        loader = loader or ParallelImageLoader()
+        if not loader.pending('map'):
+            loader.submit('map', resource_path(MAP_FILE))
+            loader.submit('fog', resource_path(FOG_IMAGE_FILE))
+        try:
+            map_image_original = to_display_format(loader.result('map'))
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Erro: Não foi possível carregar 'mapa_curitiba.png'. {e}")
+            map_image_original = pygame.Surface((16761, 16910)); map_image_original.fill((100,100,100))
+        
+        self.map_full_rect = map_image_original.get_rect()
+        self.map_source = MapPyramid(map_image_original)
+        
+        # A névoa é guardada em tiles: a imagem completa só existe durante o carregamento
+        try:
+            fog_image = to_display_format(loader.result('fog'), alpha=True)
+            self.fog = FogLayer.from_surface(fog_image, FOG_COLOR_FALLBACK)
+            del fog_image
+        except (pygame.error, FileNotFoundError):
+            print(f"Não foi possível carregar '{FOG_IMAGE_FILE}'. A usar névoa sólida de fallback.")
+            self.fog = FogLayer(self.map_full_rect.size, FOG_COLOR_FALLBACK)
+
+    def _load_poi_icon(self, poi_id):
+        """Carrega os ícones de um POI quando ele entra no ecrã pela primeira vez."""
+        return load_icon_pair(resource_path(ASSETS_FOLDER), poi_id, POI_ICON_SIZE, self.icon_atlas)
 
     def recalculate_camera_aspect(self, new_width=None):
         current_center = self.camera.center 
@@ -413,19 +638,19 @@ class Game:
         self.camera.center = current_center 
         self.check_camera_bounds()
 
-    def _setup_pois(self):
-        for i, poi_data in enumerate(PONTOS_TURISTICOS_DATA):
+    def _setup_pois(self, poi_store=None):
+        self.poi_store = poi_store or open_poi_store(resource_path(POI_DATABASE_FILE), PONTOS_TURISTICOS_DATA)
+        records = self.poi_store.load_pois()
+        self.poi_arrays = PoiArrays([pos for index, poi_id, nome, pos in records])
+        for i, (index, poi_id, nome, pos) in enumerate(records):
             is_initial = (i == 0)
-            outline_img = self.poi_outline_images.get(poi_data["id"])
-            fill_img = self.poi_fill_images.get(poi_data["id"])
-            poi_obj = POI(poi_data, i, outline_img, fill_img, is_initial=is_initial)
+            poi_data = {"id": poi_id, "nome": nome, "pos": pos}
+            poi_obj = POI(poi_data, index, i, self.poi_arrays, self.poi_store, self.icon_cache, is_initial=is_initial)
             self.pois.add(poi_obj)
-
-    def map_to_screen(self, map_pos):
-        scale = self.screen_size[0] / self.camera.width
-        x = (map_pos.x - self.camera.x) * scale
-        y = (map_pos.y - self.camera.y) * scale
-        return pygame.math.Vector2(x, y)
+            self.poi_list.append(poi_obj)
+            self.poi_index.insert(poi_obj)
+        # Ordem das revelações: percurso curto a partir do POI inicial (e não a ordem da lista)
+        self.tour = TourPlanner(self.poi_arrays.map_pos, start=0, completed=self.poi_arrays.completed)
 
     def screen_to_map(self, screen_pos):
         scale = self.camera.width / self.screen_size[0]
@@ -433,30 +658,60 @@ class Game:
         y = screen_pos[1] * scale + self.camera.y
         return pygame.math.Vector2(x, y)
 
-    def trigger_sequential_reveal(self, completed_index, completed_pos):
-        next_poi_to_reveal = None
-        all_pois = self.pois.sprites()
-        for i in range(len(all_pois)):
-            idx_to_check = (completed_index + 1 + i) % len(all_pois)
-            poi_to_check = next((p for p in all_pois if p.index == idx_to_check), None)
-            if poi_to_check and not poi_to_check.is_completed:
-                next_poi_to_reveal = poi_to_check
-                break
+    def _restore_progress(self):
+        state = load_progress(self.progress_path)
+        if state is None:
+            return
+        if state["poi_count"] == len(self.pois):
+            for poi in self.pois:
+                poi.is_completed = poi.index in state["completed"]
+                poi.is_visible = poi.is_visible or poi.index in state["visible"]
+            if state["reveals"]:
+                # Replaneia os que faltam a partir do último POI concluído (o centro da última revelação)
+                x, y, radius = state["reveals"][-1]
+                near = self.poi_index.query_radius((x, y), 1)
+                self.tour.plan(near[0].row if near else 0)
+        else:
+            print("A lista de POIs mudou desde a última gravação. Só a névoa foi restaurada.")
+        self.reveal_circles = state["reveals"]
+        self.fog.restore_circles(self.reveal_circles)
+        if state["camera"]:
+            x, y, width = state["camera"]
+            self.recalculate_camera_aspect(width)
+            self.camera.topleft = (x, y)
+            self.check_camera_bounds()
+
+    def save_progress(self):
+        if self.progress_path:
+            save_progress(self.progress_path, self.pois.sprites(), self.reveal_circles, self.camera)
+
+    def trigger_sequential_reveal(self, completed_row, completed_pos):
+        next_row = self.tour.complete(completed_row)
+        next_poi_to_reveal = self.poi_list[next_row] if next_row is not None else None
         if next_poi_to_reveal:
             reveal_radius = completed_pos.distance_to(next_poi_to_reveal.map_pos) + 150
         else:
             reveal_radius = 800
-        self.reveal_animations.append(RevealAnimation(self.fog_surface, completed_pos, reveal_radius))
+        self.reveal_animations.append(RevealAnimation(self.fog, completed_pos, reveal_radius))
         self.reveal_pois_in_area(completed_pos, reveal_radius)
+        self.reveal_circles.append((int(completed_pos.x), int(completed_pos.y), int(reveal_radius)))
+        self.save_progress()
 
     def handle_zoom(self, zoom_direction, mouse_pos_tuple):
+        self.camera_flight = None
+        self.camera = self.zoomed_camera(zoom_direction, mouse_pos_tuple)
+
+    def zoomed_camera(self, zoom_direction, mouse_pos_tuple):
+        """Calcula a câmara depois de um passo de zoom centrado no rato, sem a aplicar."""
         mouse_pos = pygame.math.Vector2(mouse_pos_tuple)
         mouse_map_pos = self.screen_to_map(mouse_pos)
         
         if zoom_direction > 0: zoom_factor = 0.8
         else: zoom_factor = 1.25
-        
-        new_width = self.camera.width * zoom_factor
+        return self.camera_at(self.camera.width * zoom_factor, mouse_pos, mouse_map_pos)
+
+    def camera_at(self, new_width, screen_pos, map_pos):
+        """Câmara com a largura pedida (limitada como no zoom) em que 'map_pos' fica em 'screen_pos'."""
         min_cam_w = self.map_full_rect.width / 15.0
 
         map_aspect = self.map_full_rect.width / self.map_full_rect.height
@@ -467,69 +722,119 @@ class Game:
         if new_width > max_cam_w: new_width = max_cam_w
         if new_width < min_cam_w: new_width = min_cam_w
             
-        self.camera.width = new_width
-        self.camera.height = new_width / (self.screen_size[0] / self.screen_size[1])
-        new_scale = self.camera.width / self.screen_size[0]
-        self.camera.x = mouse_map_pos.x - (mouse_pos.x * new_scale)
-        self.camera.y = mouse_map_pos.y - (mouse_pos.y * new_scale)
-        self.check_camera_bounds()
-
-    def check_camera_bounds(self):
-        if self.camera.width >= self.map_full_rect.width:
-            self.camera.centerx = self.map_full_rect.centerx
+        camera = self.camera.copy()
+        camera.width = new_width
+        camera.height = new_width / (self.screen_size[0] / self.screen_size[1])
+        new_scale = camera.width / self.screen_size[0]
+        camera.x = map_pos[0] - (screen_pos[0] * new_scale)
+        camera.y = map_pos[1] - (screen_pos[1] * new_scale)
+        self.check_camera_bounds(camera)
+        return camera
+
+    def check_camera_bounds(self, camera=None):
+        if camera is None:
+            camera = self.camera
+        if camera.width >= self.map_full_rect.width:
+            camera.centerx = self.map_full_rect.centerx
         else:
-            self.camera.left = max(self.camera.left, self.map_full_rect.left)
-            self.camera.right = min(self.camera.right, self.map_full_rect.right)
+            camera.left = max(camera.left, self.map_full_rect.left)
+            camera.right = min(camera.right, self.map_full_rect.right)
         
-        if self.camera.height >= self.map_full_rect.height:
-            self.camera.centery = self.map_full_rect.centery
+        if camera.height >= self.map_full_rect.height:
+            camera.centery = self.map_full_rect.centery
         else:
-            self.camera.top = max(self.camera.top, self.map_full_rect.top)
-            self.camera.bottom = min(self.camera.bottom, self.map_full_rect.bottom)
+            camera.top = max(camera.top, self.map_full_rect.top)
+            camera.bottom = min(camera.bottom, self.map_full_rect.bottom)
     
     def reveal_pois_in_area(self, map_pos, radius):
-        reveal_rect = pygame.Rect(map_pos[0] - radius, map_pos[1] - radius, radius*2, radius*2)
-        for poi in self.pois:
-            if not poi.is_visible and reveal_rect.collidepoint(poi.map_pos):
-                poi.is_visible = True
-
-    def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+        # A grelha só olha para as células tocadas pelo círculo; as flags ficam nos arrays
+        rows = [poi.row for poi in self.poi_index.query_radius(map_pos, radius)]
+        self.poi_arrays.visible[rows] = True
+
+    def center_camera_on(self, map_pos):
+        self.camera_flight = None
+        self.camera.center = (int(map_pos[0]), int(map_pos[1]))
+        self.check_camera_bounds()
+
+    def open_search(self, query=''):
+        if self.search_index is None:
+            self.search_index = PoiSearchIndex(self.poi_store.load_texts())
+        self.search_bar = SearchBar(self.search_index, self.poi_list, self.font_card_body, self.screen_size, query)
+
+    def fly_to_poi(self, row):
+        """Fecha a pesquisa e leva a câmara até ao POI, aproximando se estiver muito afastada."""
+        self.search_bar = None
+        target_width = min(self.camera.width, self.map_full_rect.width * CAMERA_FLIGHT_WIDTH_FRACTION)
+        self.camera_flight = CameraFlight(self.camera, self.poi_list[row].map_pos, target_width)
+
+    def pick_poi(self, screen_pos):
+        """Devolve o POI visível sob o ponto do ecrã, consultando só as células próximas."""
+        scale = self.screen_size[0] / self.camera.width
+        map_radius = icon_pick_radius(POI_ICON_SIZE, POI_MAX_SHAKE, scale)
+        return self.poi_index.pick(screen_pos, self.screen_to_map(screen_pos), map_radius,
+                                   predicate=lambda poi: poi.is_visible)
+
+    def handle_events(self, events=None):
+        """Processa os eventos pendentes (ou a lista dada, por exemplo numa reprodução gravada)."""
+        for event in (pygame.event.get() if events is None else events):
+            if hasattr(event, 'pos') and event.type != REVEAL_EVENT:
+                self.mouse_pos = event.pos
+            # Mover o rato sobre o mapa parado não muda nada no ecrã; o resto do input sim
+            if event.type != pygame.MOUSEMOTION or event.buttons[0] or self.active_card:
+                self.needs_redraw = True
+            if event.type == pygame.QUIT: self.save_progress(); pygame.quit(); sys.exit()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                frame_profiler.toggle()
+            elif self.search_bar and event.type in (pygame.KEYDOWN, pygame.TEXTINPUT):
+                choice = self.search_bar.handle_event(event)
+                if choice == 'close':
+                    self.search_bar = None
+                elif choice is not None:
+                    self.fly_to_poi(choice)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_f and event.mod & pygame.KMOD_CTRL:
+                self.open_search()
+            elif event.type == pygame.TEXTINPUT and not self.active_card:
+                self.open_search(event.text) # Começar a escrever também abre a pesquisa
             elif event.type == REVEAL_EVENT:
-                self.trigger_sequential_reveal(event.index, event.pos)
+                self.trigger_sequential_reveal(event.row, event.pos)
             elif event.type == pygame.VIDEORESIZE:
-                self.screen_size = (event.w, event.h)
-                self.screen = pygame.display.set_mode(self.screen_size, pygame.RESIZABLE)
-                self.recalculate_camera_aspect(self.camera.width)
-                if self.active_card:
-                    self.active_card.update_position(self.screen_size)
+                self.resize((event.w, event.h))
+            elif event.type == pygame.WINDOWSIZECHANGED and self.textures is not None:
+                # A janela do backend de texturas não é a do pygame.display e não gera VIDEORESIZE
+                self.resize((event.x, event.y))
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                if self.active_card and self.active_card.state == 'idle':
+                if self.search_bar and event.button == 1 and self.search_bar.rect.collidepoint(event.pos):
+                    row = self.search_bar.result_at(event.pos)
+                    if row is not None:
+                        self.fly_to_poi(row)
+                elif event.button == 1 and not self.active_card and self.minimap.rect.collidepoint(event.pos):
+                    self.minimap_dragging = True
+                    self.center_camera_on(self.minimap.map_pos(event.pos))
+                elif self.active_card and self.active_card.state == 'idle':
                     if self.active_card.button_screen_rect.collidepoint(event.pos):
                         if not self.active_card.poi.is_completed:
                             self.active_card.poi.start_shake_animation()
                         self.active_card.start_disappearing()
                 elif event.button == 1 and not self.active_card:
-                    clicked_a_poi = False
-                    for poi in self.pois:
-                        if poi.is_visible and poi.rect.collidepoint(event.pos):
-                            self.clicked_on_poi = poi
-                            clicked_a_poi = True
-                            break
-                    if not clicked_a_poi: self.is_dragging = True
+                    self.clicked_on_poi = self.pick_poi(event.pos)
+                    if not self.clicked_on_poi: self.is_dragging = True
             elif event.type == pygame.MOUSEBUTTONUP:
                 if event.button == 1:
                     if self.clicked_on_poi:
                         if self.clicked_on_poi.rect.collidepoint(event.pos):
-                            self.active_card = InfoCard(self.clicked_on_poi, self.font_card_title, self.font_card_body, self.screen_size)
+                            self.active_card = InfoCard(self.clicked_on_poi, self.font_card_title, self.font_card_body, self.screen_size,
+                                                       self.card_images.get(self.clicked_on_poi))
                     self.is_dragging = False
+                    self.minimap_dragging = False
                     self.clicked_on_poi = None
             elif event.type == pygame.MOUSEMOTION:
+                if self.minimap_dragging:
+                    self.center_camera_on(self.minimap.map_pos(event.pos))
                 if self.clicked_on_poi and not self.is_dragging:
                     self.is_dragging = True
                     self.clicked_on_poi = None
                 if self.is_dragging and not self.active_card:
+                    self.camera_flight = None
                     scale = self.camera.width / self.screen_size[0]
                     dx, dy = event.rel
                     self.camera.x -= dx * scale
@@ -537,62 +842,169 @@ class Game:
                     self.check_camera_bounds()
             elif event.type == pygame.MOUSEWHEEL:
                 if self.active_card:
-                    self.active_card.handle_scroll(event)
+                    self.active_card.handle_scroll(event, self.mouse_pos)
                 else:
-                    self.handle_zoom(event.y, pygame.mouse.get_pos())
+                    self.handle_zoom(event.y, self.mouse_pos)
+
+    def resize(self, screen_size):
+        self.screen_size = screen_size
+        if self.textures is None:
+            self.screen = pygame.display.set_mode(self.screen_size, pygame.RESIZABLE)
+        self.recalculate_camera_aspect(self.camera.width)
+        if self.active_card:
+            self.active_card.update_position(self.screen_size)
+        if self.search_bar:
+            self.search_bar.update_position(self.screen_size)
+        self.minimap.update_position(self.screen_size)
 
     def update_all(self):
         """Atualiza a lógica de todos os objetos do jogo."""
         if self.active_card:
-            self.active_card.update(pygame.mouse.get_pos())
+            self.active_card.update(self.mouse_pos)
             if self.active_card.is_finished():
                 self.active_card = None
             
-        any(anim.update() for anim in self.reveal_animations)
+        for anim in self.reveal_animations:
+            anim.update()
+            if anim.is_finished:
+                # A animação sai da lista já neste frame, por isso o círculo só entra uma vez no minimapa
+                self.minimap.reveal(anim.map_pos, anim.final_radius)
         self.reveal_animations = [anim for anim in self.reveal_animations if not anim.is_finished]
 
-        for poi in self.pois:
-            if self.camera.collidepoint(poi.map_pos):
-                screen_pos = self.map_to_screen(poi.map_pos)
-                poi.update(screen_pos)
+        if self.camera_flight:
+            center, width = self.camera_flight.update()
+            self.camera = self.camera_at(width, (self.screen_size[0] / 2, self.screen_size[1] / 2), center)
+            if self.camera_flight.is_finished:
+                self.camera_flight = None
+
+        # Tremor, recorte e conversão para o ecrã de todos os POIs de uma vez (também os que tremem fora do ecrã)
+        arrays = self.poi_arrays
+        for row in arrays.update_shakes(pygame.time.get_ticks(), POI_SHAKE_DURATION, POI_MAX_SHAKE):
+            poi = self.poi_list[row]
+            pygame.event.post(pygame.event.Event(REVEAL_EVENT, {"pos": poi.map_pos, "index": poi.index, "row": int(row)}))
+        self.visible_rows = arrays.update_screen(self.camera, self.screen_size[0] / self.camera.width).tolist()
+        self.tinted_icons.reserve(len(self.visible_rows))
+
+        if self.tile_provider:
+            self._prefetch_tiles()
+
+    def _prefetch_tiles(self):
+        """Pede os tiles na direção do movimento da câmara e do próximo zoom sob o rato."""
+        dx = self.camera.x - self.last_camera_pos[0]
+        dy = self.camera.y - self.last_camera_pos[1]
+        self.last_camera_pos = self.camera.topleft
+        vx, vy = self.camera_velocity
+        self.camera_velocity = (vx * 0.7 + dx * 0.3, vy * 0.7 + dy * 0.3)
+        if abs(self.camera_velocity[0]) < 0.5 and abs(self.camera_velocity[1]) < 0.5:
+            self.camera_velocity = (0, 0)
+
+        zoom_camera = None
+        if not self.active_card:
+            zoom_camera = self.zoomed_camera(1, self.mouse_pos)
+        self.tile_provider.prefetch(self.camera, self.screen_size[0] / self.camera.width, self.camera_velocity,
+                                    zoom_camera, self.screen_size[0] / zoom_camera.width if zoom_camera else None)
 
     def draw_all(self):
         """Desenha todos os elementos do jogo no ecrã."""
-        self.screen.fill(BACKGROUND_COLOR)
-        
-        int_camera_rect = pygame.Rect(int(self.camera.x), int(self.camera.y), int(self.camera.width), int(self.camera.height))
-        render_rect = int_camera_rect.clip(self.map_full_rect)
-
-        if render_rect.width > 0 and render_rect.height > 0:
-            map_subsurface = self.map_image_original.subsurface(render_rect)
-            fog_subsurface = self.fog_surface.subsurface(render_rect)
-            
-            scale = self.screen_size[0] / self.camera.width
-            dest_x = (render_rect.x - self.camera.x) * scale
-            dest_y = (render_rect.y - self.camera.y) * scale
-            dest_w = render_rect.width * scale
-            dest_h = render_rect.height * scale
-
-            map_scaled = pygame.transform.scale(map_subsurface, (int(dest_w), int(dest_h)))
-            fog_scaled = pygame.transform.scale(fog_subsurface, (int(dest_w), int(dest_h)))
-            
-            self.screen.blit(map_scaled, (dest_x, dest_y))
-            self.screen.blit(fog_scaled, (dest_x, dest_y))
-
-        for poi in self.pois:
-            if self.camera.collidepoint(poi.map_pos):
-                poi.draw(self.screen)
+        # O mapa vem da cache de tiles ou da pirâmide em memória; ambos escolhem o nível pelo zoom
+        scale = self.screen_size[0] / self.camera.width
+        reveal_holes = [(anim.map_pos, anim.current_radius) for anim in self.reveal_animations]
+        if self.textures is not None:
+            self.textures.draw_frame(self, scale, reveal_holes)
+            self._finish_draw()
+            return
+        if reveal_holes:
+            # A névoa muda a cada frame da revelação, por isso não vale a pena guardar o frame
+            self.pan_cache.invalidate()
+            self.screen.fill(BACKGROUND_COLOR)
+            self.map_source.draw(self.screen, self.camera, scale)
+            self.fog.draw(self.screen, self.camera, scale, reveal_holes)
+        else:
+            # Ao arrastar com o mesmo zoom, só as faixas novas do mapa e da névoa são desenhadas
+            full_redraw_key = (scale, self.camera.size, self.fog.version)
+            self.pan_cache.draw(self.screen, self.camera, scale, full_redraw_key, self._render_map_and_fog,
+                                self.tile_provider.completed_jobs if self.tile_provider else None)
+
+        # Todos os POIs visíveis vão num único blits, com os ícones tingidos já em cache
+        t = frame_profiler.start()
+        poi_blits = []
+        for row in self.visible_rows:
+            poi_blits.extend(self.poi_list[row].blit_items(self.tinted_icons))
+        self.screen.blits(poi_blits, doreturn=False)
+        t = frame_profiler.stop('pois', t)
+
+        self.minimap.draw(self.screen, self.camera)
+        t = frame_profiler.stop('minimap', t)
         
         if self.active_card: self.active_card.draw(self.screen)
+        if self.search_bar: self.search_bar.draw(self.screen)
+        frame_profiler.stop('card', t)
+
+        if frame_profiler.show_hud:
+            frame_profiler.draw_hud(self.screen, self.font_hud, self.clock.get_fps())
+        self._finish_draw()
+
+    def _finish_draw(self):
+        """Guarda o estado desenhado, para o modo de espera saber se é preciso redesenhar."""
+        self.needs_redraw = False
+        self.last_drawn_camera = self.camera.copy()
+        if self.tile_provider:
+            self.last_tiles_completed = self.tile_provider.completed_jobs
+
+    def _render_map_and_fog(self, surface, view):
+        """Desenha o mapa e a névoa da vista dada; devolve False se faltavam tiles."""
+        scale = self.screen_size[0] / self.camera.width
+        self.map_source.draw(surface, view, scale)
+        self.fog.draw(surface, view, scale)
+        return not (self.tile_provider and self.tile_provider.used_fallback)
+
+    def is_animating(self):
+        """Há alguma animação a decorrer que obriga a desenhar ao ritmo normal?"""
+        return bool(self.reveal_animations or self.poi_arrays.shaking.any() or frame_profiler.show_hud
+                    or self.camera_flight or (self.active_card and self.active_card.state != 'idle'))
+
+    def scene_changed(self):
+        """O próximo frame seria diferente do último desenhado?"""
+        if self.needs_redraw or self.is_animating() or self.camera != self.last_drawn_camera:
+            return True
+        return bool(self.tile_provider and self.tile_provider.completed_jobs != self.last_tiles_completed)
+
+    def run_frame(self, events=None):
+        frame_start = t = frame_profiler.start()
+        self.handle_events(events)
+        t = frame_profiler.stop('events', t)
+        self.update_all()
+        frame_profiler.stop('update', t)
+        self.draw_all()
+        t = frame_profiler.start()
+        self.present()
+        frame_profiler.stop('flip', t)
+        frame_profiler.end_frame(frame_start)
+        if self.startup is not None:
+            self.startup.mark("primeiro frame")
+            print(self.startup.summary())
+            self.startup = None
+        if frame_profiler.enabled:
+            frame_profiler.maybe_export(pygame.time.get_ticks())
+
+    def present(self):
+        if self.textures is None:
+            pygame.display.flip()
+        else:
+            self.textures.present()
 
     def run(self):
         while True:
-            self.handle_events()
-            self.update_all()
-            self.draw_all()
-            pygame.display.flip()
-            self.clock.tick(60)
+            if self.scene_changed():
+                self.run_frame()
+                self.clock.tick(60)
+                continue
+            # Cena parada: bloqueia até chegar input em vez de redesenhar a 60 FPS
+            loading = self.tile_provider and self.tile_provider.is_loading()
+            event = pygame.event.wait(IDLE_WAIT_LOADING if loading else IDLE_WAIT_TIMEOUT)
+            if event.type != pygame.NOEVENT:
+                self.handle_events([event] + pygame.event.get())
 
 if __name__ == '__main__':
-    game = Game()
+    game = Game(progress_path=default_progress_path())
     game.run()
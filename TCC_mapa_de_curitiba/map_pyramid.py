@@ -0,0 +1,108 @@
+import math
+import pygame
+from viewport import camera_render_rect, snap_to_screen
+from profiler import frame_profiler
+from parallel_scale import scale_pool
+
+# Tamanho (maior lado) abaixo do qual deixamos de criar níveis mais pequenos
+PYRAMID_MIN_SIZE = 256
+PYRAMID_DRAW_CHUNK = 256 # A região visível é escalada em blocos deste lado (pixels do nível), em paralelo
+
+
+def choose_level(map_pixels_per_screen_pixel, level_count):
+    """Escolhe o nível mais reduzido que ainda tem pelo menos um pixel por pixel do ecrã."""
+    if map_pixels_per_screen_pixel <= 1:
+        return 0
+    level = int(math.floor(math.log2(map_pixels_per_screen_pixel)))
+    return max(0, min(level, level_count - 1))
+
+
+# --- Pirâmide de Níveis de Detalhe (mipmaps) do Mapa ---
+class MapPyramid:
+    """Guarda o mapa reduzido por 2x, 4x, 8x... para que o custo de escalar
+    cada frame dependa do tamanho da janela e não do tamanho do mapa."""
+
+    def __init__(self, base_surface, min_size=PYRAMID_MIN_SIZE):
+        self.levels = [base_surface]
+        self.full_size = base_surface.get_size()
+        surface = base_surface
+        while max(surface.get_size()) > min_size:
+            w, h = surface.get_size()
+            next_size = (max(1, w // 2), max(1, h // 2))
+            try:
+                surface = pygame.transform.smoothscale(surface, next_size)
+            except ValueError:
+                # smoothscale só aceita superfícies de 24/32 bits
+                surface = pygame.transform.scale(surface, next_size)
+            self.levels.append(surface)
+
+    def choose_level(self, map_pixels_per_screen_pixel):
+        return choose_level(map_pixels_per_screen_pixel, len(self.levels))
+
+    def thumbnail(self):
+        """O nível mais pequeno (até PYRAMID_MIN_SIZE de lado), para o minimapa."""
+        return self.levels[-1]
+
+    def level_rect(self, level, map_rect):
+        """Converte um retângulo em coordenadas do mapa original para o nível pedido."""
+        surface = self.levels[level]
+        fx = surface.get_width() / self.full_size[0]
+        fy = surface.get_height() / self.full_size[1]
+        left = int(map_rect.left * fx)
+        top = int(map_rect.top * fy)
+        right = max(left + 1, int(math.ceil(map_rect.right * fx)))
+        bottom = max(top + 1, int(math.ceil(map_rect.bottom * fy)))
+        return pygame.Rect(left, top, right - left, bottom - top).clip(surface.get_rect())
+
+    def subsurface(self, level, map_rect):
+        """Devolve a região 'map_rect' (coordenadas do mapa original) no nível pedido."""
+        return self.levels[level].subsurface(self.level_rect(level, map_rect))
+
+    def draw(self, target, camera, scale):
+        """Desenha em 'target' a região do mapa visível pela câmara."""
+        render_rect = camera_render_rect(camera, self.levels[0].get_rect())
+        if render_rect.width <= 0 or render_rect.height <= 0:
+            return
+        # Usa o nível da pirâmide mais próximo do zoom atual em vez do mapa original
+        level = self.choose_level(1 / scale)
+        surface = self.levels[level]
+        area = self.level_rect(level, render_rect)
+        fx = self.full_size[0] / surface.get_width()
+        fy = self.full_size[1] / surface.get_height()
+
+        t = frame_profiler.start()
+        jobs, positions = [], []
+        chunk = PYRAMID_DRAW_CHUNK
+        for top in range(area.top - area.top % chunk, area.bottom, chunk):
+            for left in range(area.left - area.left % chunk, area.right, chunk):
+                part = pygame.Rect(left, top, chunk, chunk).clip(area)
+                # Bordas arredondadas como nos tiles, para que blocos vizinhos não deixem frestas
+                dest = snap_to_screen(part.left * fx, part.top * fy, part.right * fx, part.bottom * fy, camera, scale)
+                if dest.width <= 0 or dest.height <= 0:
+                    continue
+                jobs.append((surface.subsurface(part), dest.size))
+                positions.append(dest.topleft)
+        scaled = scale_pool.scale_many(jobs)
+        t = frame_profiler.stop('map_scale', t)
+        target.blits(list(zip(scaled, positions)), doreturn=False)
+        frame_profiler.stop('map_blit', t)
+
+    def draw_textured(self, textures, camera, scale):
+        """Como draw, mas cada bloco do nível é enviado uma vez como textura e escalado pelo renderer."""
+        render_rect = camera_render_rect(camera, self.levels[0].get_rect())
+        if render_rect.width <= 0 or render_rect.height <= 0:
+            return
+        level = self.choose_level(1 / scale)
+        surface = self.levels[level]
+        area = self.level_rect(level, render_rect)
+        fx = self.full_size[0] / surface.get_width()
+        fy = self.full_size[1] / surface.get_height()
+        chunk = PYRAMID_DRAW_CHUNK
+        for top in range(area.top - area.top % chunk, area.bottom, chunk):
+            for left in range(area.left - area.left % chunk, area.right, chunk):
+                # Blocos inteiros (e não só a parte visível) para que a mesma textura sirva ao arrastar
+                part = pygame.Rect(left, top, chunk, chunk).clip(surface.get_rect())
+                dest = snap_to_screen(part.left * fx, part.top * fy, part.right * fx, part.bottom * fy, camera, scale)
+                if dest.width <= 0 or dest.height <= 0:
+                    continue
+                textures.get(('map', level, left, top), lambda: surface.subsurface(part)).draw(dstrect=dest)
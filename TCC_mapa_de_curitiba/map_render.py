@@ -0,0 +1,368 @@
+"""Desenho do mapa sem janela, para imagens estáticas (placas, página web).
+
+Uma vista qualquer, a partir de código:
+
+    scene = MapScene.load()
+    imagem = scene.render(pygame.Rect(4000, 3000, 2000, 1500), (1600, 1200), load_progress(caminho))
+
+Pela linha de comandos, uma imagem ou todos os tiles z/x/y de um "slippy map"
+(o formato do OpenStreetMap/Leaflet), estes em paralelo por todos os núcleos:
+
+    python map_render.py --view 4000,3000,2000,1500 --size 1600x1200 --out placa.png
+    python map_render.py --out tiles --progress progresso.json
+    python map_render.py --out tiles --min-zoom 3 --max-zoom 6 --workers 8
+    python map_render.py --out tiles --build-cache   # sem assets/tile_cache, gera uma cache própria
+
+No zoom máximo por omissão, um pixel do tile é um pixel do mapa. Se a
+exportação for interrompida, o mesmo comando continua onde parou. Os tiles
+são exportados a partir de uma cache de tiles: a de assets/tile_cache, ou uma
+gerada com --build-cache na pasta de dados do utilizador (o jogo não a usa).
+"""
+import argparse
+import collections
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import struct
+import time
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+from main import (resource_path, ASSETS_FOLDER, MAP_FILE, FOG_IMAGE_FILE, TILE_CACHE_FOLDER, POI_DATABASE_FILE,
+                  BACKGROUND_COLOR, FOG_COLOR_FALLBACK, GOLD, WHITE, POI_ICON_SIZE, POI_ICON_CACHE_SIZE)
+from map_pyramid import MapPyramid
+from fog import FogLayer
+from tile_cache import TileCache, build_tile_cache
+from spatial_index import PoiGrid
+from poi_store import LruCache, open_poi_store
+from poi_icons import TintedIconCache, load_icon_pair
+from icon_atlas import IconAtlas
+from parallel_scale import scale_pool
+from progress import load_progress
+from user_paths import user_data_dir
+from viewport import MapView
+from pontos_turisticos import PONTOS_TURISTICOS_DATA
+
+POI_FALLBACK_RADIUS = 15 # Igual a POI.radius em main.py
+SLIPPY_TILE_SIZE = 256
+EXPORT_STATE_VERSION = 1
+EXPORT_STATE_FILE = 'export.json' # Parâmetros da exportação, para saber se os tiles já escritos servem
+EXPORT_REPORT_INTERVAL = 5 # Segundos entre relatórios de progresso
+EXPORT_CHUNK_SIZE = 8 # Tiles vizinhos enviados juntos a cada processo (partilham tiles da cache)
+EXPORT_CACHE_FOLDER = 'tile_cache' # Na pasta de dados do utilizador, gerada só com --build-cache
+
+ScenePoi = collections.namedtuple('ScenePoi', 'index id map_pos')
+
+
+# --- Cena Sem Janela ---
+class MapScene:
+    """Mapa, névoa e POIs carregados sem janela; cada render devolve uma superfície nova.
+
+    A névoa é mantida entre renders: um progresso que só acrescenta revelações
+    ao anterior recorta apenas os círculos novos.
+    """
+
+    def __init__(self, map_source, map_rect, load_fog, poi_store, icon_atlas=None):
+        self.map_source = map_source
+        self.map_rect = map_rect
+        self._load_fog = load_fog
+        self.fog = load_fog()
+        self._applied_reveals = []
+        self.pois = [ScenePoi(index, poi_id, pos) for index, poi_id, nome, pos in poi_store.load_pois()]
+        self.poi_index = PoiGrid()
+        for poi in self.pois:
+            self.poi_index.insert(poi)
+        self.visible = set()
+        self.completed = set()
+        assets_dir = resource_path(ASSETS_FOLDER)
+        self.icon_cache = LruCache(POI_ICON_CACHE_SIZE,
+                                   lambda poi_id: load_icon_pair(assets_dir, poi_id, POI_ICON_SIZE, icon_atlas))
+        self.tinted_icons = TintedIconCache(self.icon_cache)
+        self._has_icon = {}
+        self.apply_progress(None)
+
+    @classmethod
+    def load(cls, poi_store=None, cache_dir=None):
+        """Usa a cache de tiles se existir (só se lê o que é desenhado); senão as imagens completas.
+
+        'cache_dir' é a pasta da cache; por omissão, a que find_tile_cache encontrar.
+        """
+        poi_store = poi_store or open_poi_store(resource_path(POI_DATABASE_FILE), PONTOS_TURISTICOS_DATA)
+        assets_dir = resource_path(ASSETS_FOLDER)
+        atlas_index = IconAtlas.load_index(assets_dir)
+        icon_atlas = IconAtlas(pygame.image.load(IconAtlas.paths(assets_dir)[0]), atlas_index) if atlas_index else None
+
+        cache_dir = cache_dir or find_tile_cache()
+        if cache_dir:
+            try:
+                tile_cache = TileCache(cache_dir)
+                return cls(tile_cache, tile_cache.map_rect.copy(), lambda: tile_cache.load_fog(FOG_COLOR_FALLBACK),
+                           poi_store, icon_atlas)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Cache de tiles inválida ({e}). A carregar as imagens completas.")
+
+        map_image = pygame.image.load(resource_path(MAP_FILE))
+        map_rect = map_image.get_rect()
+
+        def load_fog():
+            try:
+                return FogLayer.from_surface(pygame.image.load(resource_path(FOG_IMAGE_FILE)), FOG_COLOR_FALLBACK)
+            except (pygame.error, FileNotFoundError):
+                print(f"Não foi possível carregar '{FOG_IMAGE_FILE}'. A usar névoa sólida de fallback.")
+                return FogLayer(map_rect.size, FOG_COLOR_FALLBACK)
+
+        return cls(MapPyramid(map_image), map_rect, load_fog, poi_store, icon_atlas)
+
+    def apply_progress(self, progress):
+        """Põe a névoa e os POIs no estado de 'progress' (como devolvido por load_progress; None = início do jogo)."""
+        reveals = list(progress["reveals"]) if progress else []
+        applied = self._applied_reveals
+        if reveals[:len(applied)] != applied:
+            self.fog = self._load_fog()
+            applied = []
+        if len(reveals) > len(applied):
+            self.fog.restore_circles(reveals[len(applied):])
+        self._applied_reveals = reveals
+
+        # Como no jogo: se a lista de POIs mudou, só a névoa é restaurada
+        same_pois = progress is not None and progress["poi_count"] == len(self.pois)
+        self.completed = progress["completed"] if same_pois else set()
+        self.visible = set(progress["visible"]) if same_pois else set()
+        if self.pois:
+            self.visible.add(self.pois[0].index)
+
+    def render(self, camera, output_size, progress=None):
+        """Desenha a vista 'camera' (Rect ou MapView, em pixels do mapa) numa superfície de 'output_size'."""
+        self.apply_progress(progress)
+        surface = pygame.Surface(output_size)
+        surface.fill(BACKGROUND_COLOR)
+        scale = output_size[0] / camera.width
+        self.map_source.draw(surface, camera, scale)
+        self.fog.draw(surface, camera, scale)
+        self._draw_pois(surface, camera, scale)
+        return surface
+
+    def _draw_pois(self, surface, camera, scale):
+        # Inclui os POIs logo fora da vista cujo ícone ainda entra nela
+        margin = max(POI_ICON_SIZE) / scale
+        area = pygame.Rect(math.floor(camera.x - margin), math.floor(camera.y - margin),
+                           math.ceil(camera.width + 2 * margin) + 1, math.ceil(camera.height + 2 * margin) + 1)
+        # Posições arredondadas em pixels absolutos da imagem: tiles vizinhos cortam o mesmo ícone no mesmo sítio
+        origin_x, origin_y = round(camera.x * scale), round(camera.y * scale)
+        blits = []
+        candidates = self.poi_index.query_rect(area)
+        self.tinted_icons.reserve(len(candidates))
+        for poi in candidates:
+            if poi.index not in self.visible:
+                continue
+            x = round(poi.map_pos[0] * scale) - origin_x
+            y = round(poi.map_pos[1] * scale) - origin_y
+            color = WHITE if poi.index in self.completed else GOLD
+            if self._poi_has_icon(poi.id):
+                rect = pygame.Rect((0, 0), POI_ICON_SIZE)
+                rect.center = (x, y)
+                blits.append((self.tinted_icons.fill(poi.id, color, POI_ICON_SIZE), rect))
+                blits.append((self.tinted_icons.outline(poi.id, POI_ICON_SIZE), rect))
+            else:
+                r = POI_FALLBACK_RADIUS
+                blits.append((self.tinted_icons.circle(color, r), (x - r, y - r)))
+        surface.blits(blits, doreturn=False)
+
+    def _poi_has_icon(self, poi_id):
+        if poi_id not in self._has_icon:
+            self._has_icon[poi_id] = self.icon_cache.get(poi_id)[0] is not None
+        return self._has_icon[poi_id]
+
+
+# --- Cache de Tiles ---
+def export_cache_dir():
+    return os.path.join(user_data_dir(), EXPORT_CACHE_FOLDER)
+
+
+def find_tile_cache():
+    """A cache de tiles do jogo (assets/tile_cache) ou, se não existir, a gerada com --build-cache; None se nenhuma existe."""
+    for cache_dir in (resource_path(TILE_CACHE_FOLDER), export_cache_dir()):
+        if TileCache.exists(cache_dir):
+            return cache_dir
+    return None
+
+
+def build_export_cache():
+    """Gera a cache de tiles na pasta de dados do utilizador (assets/ pode ser só de leitura no executável)."""
+    cache_dir = export_cache_dir()
+    print(f"A gerar a cache de tiles em '{cache_dir}' (mais de 1 GB com o mapa completo).")
+    build_tile_cache(resource_path(MAP_FILE), resource_path(FOG_IMAGE_FILE), cache_dir, fog_color=FOG_COLOR_FALLBACK)
+    return cache_dir
+
+
+# --- Grelha de Tiles (slippy map) ---
+def map_size(cache_dir=None):
+    """Tamanho do mapa sem o carregar: do índice da cache de tiles ou do cabeçalho do PNG."""
+    cache_dir = cache_dir or find_tile_cache()
+    if cache_dir:
+        with open(os.path.join(cache_dir, 'index.json'), encoding='utf-8') as f:
+            return tuple(json.load(f)['map_size'])
+    with open(resource_path(MAP_FILE), 'rb') as f:
+        header = f.read(24)
+    if header[:8] != b'\x89PNG\r\n\x1a\n':
+        raise ValueError(f"'{MAP_FILE}' não é um PNG")
+    return struct.unpack('>II', header[16:24])
+
+
+def native_zoom(size, tile_size=SLIPPY_TILE_SIZE):
+    """Zoom em que o mapa inteiro cabe em 2^zoom tiles com um pixel do mapa por pixel do tile."""
+    return max(0, math.ceil(math.log2(max(size) / tile_size)))
+
+
+def tile_scale(zoom, base_zoom):
+    return 2.0 ** (zoom - base_zoom)
+
+
+def zoom_tiles(size, zoom, base_zoom, tile_size=SLIPPY_TILE_SIZE):
+    """(z, x, y) de todos os tiles que tocam no mapa, linha a linha."""
+    scale = tile_scale(zoom, base_zoom)
+    cols = math.ceil(size[0] * scale / tile_size)
+    rows = math.ceil(size[1] * scale / tile_size)
+    return [(zoom, x, y) for y in range(rows) for x in range(cols)]
+
+
+def tile_view(x, y, scale, tile_size=SLIPPY_TILE_SIZE):
+    side = tile_size / scale
+    return MapView(x * side, y * side, side, side)
+
+
+def tile_path(out_dir, z, x, y):
+    return os.path.join(out_dir, str(z), str(x), f"{y}.png")
+
+
+# --- Exportação em Paralelo ---
+_worker = {}
+
+
+def _init_worker(progress, out_dir, base_zoom, tile_size, cache_dir):
+    scale_pool.configure(1) # Os processos já ocupam os núcleos todos
+    scene = MapScene.load(cache_dir=cache_dir)
+    scene.apply_progress(progress)
+    _worker.update(scene=scene, progress=progress, out_dir=out_dir, base_zoom=base_zoom, tile_size=tile_size)
+
+
+def _render_tile(tile):
+    z, x, y = tile
+    scale = tile_scale(z, _worker['base_zoom'])
+    surface = _worker['scene'].render(tile_view(x, y, scale, _worker['tile_size']),
+                                      (_worker['tile_size'],) * 2, _worker['progress'])
+    path = tile_path(_worker['out_dir'], z, x, y)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Escrita atómica: um tile que existe está sempre completo, por isso retomar só salta os que existem
+    tmp_path = path[:-len('.png')] + '.tmp.png'
+    pygame.image.save(surface, tmp_path)
+    os.replace(tmp_path, path)
+    return tile
+
+
+def _progress_digest(progress):
+    if progress is None:
+        return None
+    data = {key: sorted(value) if isinstance(value, set) else value for key, value in progress.items()}
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def export_tiles(out_dir, progress=None, min_zoom=0, max_zoom=None, workers=None, tile_size=SLIPPY_TILE_SIZE,
+                 build_cache=False):
+    """Gera out_dir/z/x/y.png para cada zoom pedido e devolve o número de tiles e os tiles por segundo.
+
+    Exige uma cache de tiles (ou 'build_cache' para a gerar): sem ela cada
+    processo teria de descodificar o mapa completo e construir a sua própria
+    pirâmide (~1,5 GB por núcleo); com ela todos mapeiam os mesmos ficheiros
+    só de leitura e o sistema operativo partilha as páginas.
+    """
+    cache_dir = find_tile_cache()
+    if cache_dir is None:
+        if not build_cache:
+            raise FileNotFoundError("Não há cache de tiles para exportar. Gere-a com 'python tile_cache.py' "
+                                    "ou use --build-cache (fica na pasta de dados do utilizador).")
+        cache_dir = build_export_cache()
+    size = map_size(cache_dir)
+    base_zoom = native_zoom(size, tile_size)
+    max_zoom = base_zoom if max_zoom is None else max_zoom
+    workers = workers or os.cpu_count() or 1
+    tiles = [tile for zoom in range(min_zoom, max_zoom + 1) for tile in zoom_tiles(size, zoom, base_zoom, tile_size)]
+
+    # Os tiles já escritos só são aproveitados se foram gerados com os mesmos parâmetros e o mesmo progresso
+    os.makedirs(out_dir, exist_ok=True)
+    state = {"version": EXPORT_STATE_VERSION, "map_size": list(size), "tile_size": tile_size,
+             "base_zoom": base_zoom, "progress": _progress_digest(progress)}
+    state_path = os.path.join(out_dir, EXPORT_STATE_FILE)
+    resume = False
+    if os.path.isfile(state_path):
+        try:
+            with open(state_path, encoding='utf-8') as f:
+                resume = json.load(f) == state
+        except (OSError, ValueError):
+            pass
+        if not resume:
+            print("Os tiles existentes foram gerados com outros parâmetros ou outro progresso. A gerar de novo.")
+    with open(state_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(state_path + '.tmp', state_path)
+
+    pending = [tile for tile in tiles if not (resume and os.path.isfile(tile_path(out_dir, *tile)))]
+    print(f"Zoom {min_zoom}-{max_zoom}: {len(pending)} de {len(tiles)} tiles por gerar, com {workers} processos.")
+    start = last_report = time.perf_counter()
+    done = 0
+    if pending:
+        with multiprocessing.Pool(workers, _init_worker, (progress, out_dir, base_zoom, tile_size, cache_dir)) as pool:
+            for _ in pool.imap_unordered(_render_tile, pending, chunksize=EXPORT_CHUNK_SIZE):
+                done += 1
+                now = time.perf_counter()
+                if now - last_report >= EXPORT_REPORT_INTERVAL:
+                    print(f"{done}/{len(pending)} tiles ({done / (now - start):.1f} tiles/s)")
+                    last_report = now
+    elapsed = time.perf_counter() - start
+    tiles_per_second = done / elapsed if elapsed > 0 else 0.0
+    print(f"{done} tiles gerados em {elapsed:.1f} s ({tiles_per_second:.1f} tiles/s).")
+    return {"tiles": done, "skipped": len(tiles) - len(pending), "seconds": elapsed,
+            "tiles_per_second": tiles_per_second}
+
+
+def _parse_numbers(text, separator, count):
+    parts = text.lower().split(separator)
+    if len(parts) != count:
+        raise argparse.ArgumentTypeError(f"esperava {count} números separados por '{separator}'")
+    return tuple(float(p) if separator == ',' else int(p) for p in parts)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Desenha o mapa interativo sem janela (imagem única ou tiles z/x/y).")
+    parser.add_argument('--out', default='tiles', help="Pasta dos tiles, ou ficheiro PNG com --view")
+    parser.add_argument('--progress', help="Ficheiro de progresso (por omissão, o início do jogo)")
+    parser.add_argument('--view', type=lambda t: _parse_numbers(t, ',', 4), help="x,y,largura,altura em pixels do mapa")
+    parser.add_argument('--size', type=lambda t: _parse_numbers(t, 'x', 2), default=(1600, 1200),
+                        help="Tamanho da imagem com --view, LARGURAxALTURA")
+    parser.add_argument('--min-zoom', type=int, default=0)
+    parser.add_argument('--max-zoom', type=int, help="Por omissão, o zoom de um pixel do mapa por pixel")
+    parser.add_argument('--workers', type=int, help="Processos (por omissão, um por núcleo)")
+    parser.add_argument('--tile-size', type=int, default=SLIPPY_TILE_SIZE)
+    parser.add_argument('--build-cache', action='store_true',
+                        help="Sem assets/tile_cache, gera uma cache de tiles na pasta de dados do utilizador")
+    args = parser.parse_args()
+
+    progress = None
+    if args.progress:
+        if not os.path.isfile(args.progress):
+            parser.error(f"o ficheiro de progresso '{args.progress}' não existe")
+        progress = load_progress(args.progress)
+
+    try:
+        if args.view:
+            image = MapScene.load().render(MapView(*args.view), args.size, progress)
+            pygame.image.save(image, args.out)
+            print(f"Imagem escrita em '{args.out}'.")
+        else:
+            export_tiles(args.out, progress, args.min_zoom, args.max_zoom, args.workers, args.tile_size, args.build_cache)
+    except (pygame.error, FileNotFoundError) as e:
+        # Mapa ou cache de tiles em falta, ou mapa ilegível (o erro do pygame já traz o nome do ficheiro)
+        parser.exit(1, f"Erro: {e}\n")
@@ -0,0 +1,92 @@
+import math
+import pygame
+from fog import CLEARED
+
+MINIMAP_SIZE = 180 # Maior lado do minimapa, em pixels do ecrã
+MINIMAP_MARGIN = 10 # Distância ao canto inferior direito
+MINIMAP_BORDER_COLOR = (7, 7, 9)
+MINIMAP_VIEW_COLOR = (255, 215, 0) # Retângulo da câmara
+
+
+# --- Minimapa no Canto do Ecrã ---
+class Minimap:
+    """Mapa inteiro em miniatura, com a névoa e o retângulo da câmara.
+
+    O mapa vem de uma imagem já reduzida (o nível mais pequeno da pirâmide ou
+    da cache de tiles) e é escalado uma vez. A névoa em miniatura é construída
+    uma vez a partir dos tiles da FogLayer e depois só recebe os círculos
+    revelados, desenhados diretamente na miniatura. Cada frame custa um blit
+    do minimapa já composto e o contorno da câmara.
+    """
+
+    def __init__(self, thumbnail, fog, screen_size, circles=()):
+        map_w, map_h = fog.map_rect.size
+        factor = MINIMAP_SIZE / max(map_w, map_h)
+        self.rect = pygame.Rect(0, 0, max(1, round(map_w * factor)), max(1, round(map_h * factor)))
+        self.scale_x = self.rect.width / map_w
+        self.scale_y = self.rect.height / map_h
+        self.update_position(screen_size)
+
+        try:
+            scaled = pygame.transform.smoothscale(thumbnail, self.rect.size)
+        except ValueError:
+            # smoothscale só aceita superfícies de 24/32 bits
+            scaled = pygame.transform.scale(thumbnail, self.rect.size)
+        self.map_thumb = pygame.Surface(self.rect.size)
+        self.map_thumb.blit(scaled, (0, 0))
+        if pygame.display.get_surface():
+            self.map_thumb = self.map_thumb.convert()
+        self.fog_thumb = self._build_fog(fog)
+        for cx, cy, r in circles:
+            self.reveal((cx, cy), r)
+        self._composed = None
+
+    def update_position(self, screen_size):
+        self.rect.bottomright = (screen_size[0] - MINIMAP_MARGIN, screen_size[1] - MINIMAP_MARGIN)
+
+    def _thumb_rect(self, map_rect):
+        left = int(map_rect.left * self.scale_x)
+        top = int(map_rect.top * self.scale_y)
+        right = max(left + 1, math.ceil(map_rect.right * self.scale_x))
+        bottom = max(top + 1, math.ceil(map_rect.bottom * self.scale_y))
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def _build_fog(self, fog):
+        """Névoa em miniatura: só os tiles fora do estado "coberto" (os que existem em fog.tiles) são visitados."""
+        surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        surface.fill(fog.fog_color)
+        for key, state in fog.tiles.items():
+            block = self._thumb_rect(fog.tile_rect(*key))
+            if state is CLEARED:
+                surface.fill((0, 0, 0, 0), block)
+            else:
+                # Tile parcial: a cor média chega, cada tile ocupa 2 a 3 pixels do minimapa
+                surface.fill(pygame.transform.average_color(state), block)
+        return surface
+
+    def reveal(self, map_pos, radius):
+        """Apaga da névoa em miniatura um círculo revelado (coordenadas do mapa)."""
+        center = (round(map_pos[0] * self.scale_x), round(map_pos[1] * self.scale_y))
+        pygame.draw.circle(self.fog_thumb, (0, 0, 0, 0), center, max(1, round(radius * self.scale_x)))
+        self._composed = None
+
+    def surface(self):
+        """Mapa e névoa em miniatura já compostos; só são refeitos depois de uma revelação."""
+        if self._composed is None:
+            composed = self.map_thumb.copy()
+            composed.blit(self.fog_thumb, (0, 0))
+            pygame.draw.rect(composed, MINIMAP_BORDER_COLOR, composed.get_rect(), 1)
+            self._composed = composed
+        return self._composed
+
+    def view_rect(self, camera):
+        """Retângulo da câmara no ecrã, dentro do minimapa."""
+        return self._thumb_rect(camera).move(self.rect.topleft).clip(self.rect)
+
+    def map_pos(self, screen_pos):
+        """Ponto do mapa sob um ponto do ecrã dentro do minimapa."""
+        return ((screen_pos[0] - self.rect.left) / self.scale_x, (screen_pos[1] - self.rect.top) / self.scale_y)
+
+    def draw(self, screen, camera):
+        screen.blit(self.surface(), self.rect)
+        pygame.draw.rect(screen, MINIMAP_VIEW_COLOR, self.view_rect(camera), 2)
@@ -0,0 +1,74 @@
+import pygame
+from viewport import MapView
+
+
+# --- Reaproveitamento do Frame ao Arrastar ---
+class PanCache:
+    """Guarda o último mapa+névoa desenhado e, ao arrastar com o mesmo zoom, só desenha as faixas novas.
+
+    O frame guardado corresponde a uma vista em floats ('view_x', 'view_y').
+    Ao deslocar, move-se o frame um número inteiro de pixels e a vista avança
+    exatamente esse deslocamento, por isso as faixas novas encaixam sem costuras;
+    a diferença para a câmara real fica sempre abaixo de meio pixel do ecrã.
+    """
+
+    def __init__(self, background_color):
+        self.background_color = background_color
+        self.frame = None
+        self.key = None
+        self.view_x = self.view_y = 0.0
+        self.has_fallback = False # Alguma parte do frame foi desenhada com tiles provisórios
+        self.source_version = None
+
+    def invalidate(self):
+        self.key = None
+
+    def draw(self, target, camera, scale, key, render, source_version=None):
+        """Copia para 'target' o mapa visível pela câmara.
+
+        'key' identifica tudo o que obriga a redesenhar o ecrã inteiro (zoom,
+        versão da névoa...). 'render(surface, view)' desenha o mapa e a névoa da
+        vista dada em 'surface' e devolve False se usou tiles provisórios;
+        nesse caso, uma mudança de 'source_version' também redesenha tudo.
+        """
+        size = target.get_size()
+        stale = self.has_fallback and source_version != self.source_version
+        if self.frame is None or self.frame.get_size() != size:
+            self.frame = pygame.Surface(size).convert() if pygame.display.get_surface() else pygame.Surface(size)
+            self.key = None
+        if key != self.key or stale:
+            self._render_full(camera, render)
+        else:
+            dx = round((camera.x - self.view_x) * scale)
+            dy = round((camera.y - self.view_y) * scale)
+            if abs(dx) >= size[0] or abs(dy) >= size[1]:
+                self._render_full(camera, render)
+            elif dx or dy:
+                self._shift(dx, dy, scale, render)
+        self.key = key
+        self.source_version = source_version
+        target.blit(self.frame, (0, 0))
+
+    def _render_full(self, camera, render):
+        self.view_x, self.view_y = float(camera.x), float(camera.y)
+        self.frame.fill(self.background_color)
+        self.has_fallback = not render(self.frame, camera)
+
+    def _shift(self, dx, dy, scale, render):
+        """Move o frame (dx, dy) pixels e desenha só as faixas que ficaram a descoberto."""
+        width, height = self.frame.get_size()
+        self.frame.scroll(-dx, -dy)
+        self.view_x += dx / scale
+        self.view_y += dy / scale
+        strips = []
+        if dx > 0: strips.append(pygame.Rect(width - dx, 0, dx, height))
+        elif dx < 0: strips.append(pygame.Rect(0, 0, -dx, height))
+        if dy > 0: strips.append(pygame.Rect(0, height - dy, width, dy))
+        elif dy < 0: strips.append(pygame.Rect(0, 0, width, -dy))
+        for strip in strips:
+            surface = self.frame.subsurface(strip)
+            surface.fill(self.background_color)
+            view = MapView(self.view_x + strip.x / scale, self.view_y + strip.y / scale,
+                           strip.width / scale, strip.height / scale)
+            if not render(surface, view):
+                self.has_fallback = True
@@ -0,0 +1,57 @@
+"""Escala várias superfícies em paralelo.
+
+As funções de pygame.transform largam o GIL enquanto copiam os pixels, por
+isso vários tiles podem ser escalados ao mesmo tempo em threads. O número de
+threads vem de MAPA_SCALE_WORKERS (por omissão, até 4 núcleos); com 1 thread
+tudo corre em sequência na thread principal, sempre pela mesma ordem.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+MAX_DEFAULT_SCALE_WORKERS = 4
+
+
+def default_scale_workers():
+    configured = os.environ.get('MAPA_SCALE_WORKERS')
+    if configured:
+        return max(1, int(configured))
+    return min(MAX_DEFAULT_SCALE_WORKERS, os.cpu_count() or 1)
+
+
+def _scale_batch(jobs):
+    return [pygame.transform.scale(surface, size) for surface, size in jobs]
+
+
+# --- Conjunto de Threads para Escalar ---
+class ScalePool:
+    """Escala listas de (superfície, tamanho), devolvendo os resultados pela mesma ordem."""
+
+    def __init__(self, workers=1):
+        self.workers = 1
+        self._executor = None
+        self.configure(workers)
+
+    def configure(self, workers):
+        """Muda o número de threads (1 = modo sequencial, sem threads)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.workers = max(1, workers)
+        if self.workers > 1:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='scale')
+
+    def scale_many(self, jobs):
+        if self._executor is None or len(jobs) < 2:
+            return _scale_batch(jobs)
+        # Um lote por thread (intercalado, para equilibrar tiles grandes e pequenos) em vez de uma tarefa por tile
+        batch_count = min(self.workers, len(jobs))
+        batches = [jobs[i::batch_count] for i in range(batch_count)]
+        results = [None] * len(jobs)
+        for i, scaled in enumerate(self._executor.map(_scale_batch, batches)):
+            results[i::batch_count] = scaled
+        return results
+
+
+scale_pool = ScalePool(default_scale_workers())
@@ -0,0 +1,62 @@
+import numpy as np
+
+
+# --- Estado dos POIs em Arrays (structure of arrays) ---
+class PoiArrays:
+    """Posições e flags de todos os POIs em arrays NumPy contíguos, uma linha por POI.
+
+    A linha i é o i-ésimo POI carregado (a mesma ordem do índice). O recorte
+    pela câmara, a conversão mapa -> ecrã e o tremor são feitos para todos os
+    POIs numa só operação por frame, em vez de um ciclo Python por POI.
+    """
+
+    def __init__(self, positions):
+        count = len(positions)
+        self.map_pos = np.array(positions, dtype=np.float64).reshape(count, 2)
+        self.visible = np.zeros(count, dtype=bool)
+        self.completed = np.zeros(count, dtype=bool)
+        self.shaking = np.zeros(count, dtype=bool)
+        self.shake_start = np.zeros(count, dtype=np.int64) # pygame.time.get_ticks() do início do tremor
+        self.shake_magnitude = np.zeros(count, dtype=np.float64)
+        self.shake_offset = np.zeros(count, dtype=np.float64) # Desvio horizontal deste frame, em pixels do ecrã
+        self.screen_pos = np.zeros((count, 2), dtype=np.float64) # Última posição no ecrã (só dos POIs recortados)
+        self.rng = np.random.default_rng()
+
+    def __len__(self):
+        return len(self.map_pos)
+
+    def visible_in_rect(self, rect):
+        """Linhas dos POIs visíveis cuja posição está dentro de 'rect' (mesma regra de Rect.collidepoint)."""
+        x, y = self.map_pos[:, 0], self.map_pos[:, 1]
+        inside = (x >= rect.left) & (x < rect.right) & (y >= rect.top) & (y < rect.bottom)
+        return np.flatnonzero(inside & self.visible)
+
+    def to_screen(self, rows, camera, scale):
+        """Posições no ecrã (já com o tremor) das linhas pedidas, como array (n, 2) de floats."""
+        screen = (self.map_pos[rows] - (camera.x, camera.y)) * scale
+        screen[:, 0] += self.shake_offset[rows]
+        return screen
+
+    def update_screen(self, camera, scale):
+        """Recorta os POIs visíveis pela câmara e guarda a posição deles no ecrã; devolve as linhas recortadas."""
+        rows = self.visible_in_rect(camera)
+        self.screen_pos[rows] = self.to_screen(rows, camera, scale)
+        return rows
+
+    def update_shakes(self, now, duration, max_shake):
+        """Avança o tremor de todos os POIs a tremer e devolve as linhas que acabaram agora.
+
+        Os que acabaram ficam concluídos; quem chama dispara as revelações.
+        """
+        rows = np.flatnonzero(self.shaking)
+        if not rows.size:
+            return rows
+        elapsed = now - self.shake_start[rows]
+        finished = elapsed >= duration
+        magnitude = np.where(finished, 0.0, elapsed * (max_shake / duration))
+        self.shake_magnitude[rows] = magnitude
+        self.shake_offset[rows] = self.rng.uniform(-magnitude, magnitude)
+        done = rows[finished]
+        self.shaking[done] = False
+        self.completed[done] = True
+        return done
@@ -0,0 +1,105 @@
+import os
+import pygame
+import pygame.gfxdraw
+from poi_store import LruCache
+
+TINTED_ICON_CACHE_SIZE = 512 # Ícones tingidos mantidos em memória (cada POI usa 1 ou 2 cores)
+TINTED_CIRCLE_SLOTS = 8 # Lugares extra para os círculos de fallback (poucas cores e raios)
+TINTED_RESERVE_MAX_POIS = 1024 # Teto do crescimento das caches (~64 MB de ícones de 64x64 no máximo)
+MISSING_ICON_WARNINGS = 5 # Ícones em falta avisados um a um; os seguintes não são avisados
+POI_CIRCLE_OUTLINE_COLOR = (0, 0, 0)
+
+_missing_icons = set()
+
+
+# --- Cache de Ícones Tingidos ---
+class TintedIconCache:
+    """Guarda as superfícies já tingidas por (id, cor, tamanho) para não copiar e misturar a cada frame."""
+
+    def __init__(self, icon_cache, capacity=TINTED_ICON_CACHE_SIZE):
+        self.icon_cache = icon_cache
+        self._surfaces = LruCache(capacity, self._render)
+        self._icon_base = icon_cache.capacity
+        self._surface_base = capacity
+
+    def fill(self, poi_id, color, size):
+        return self._surfaces.get(('fill', poi_id, color, size))
+
+    def outline(self, poi_id, size):
+        return self._surfaces.get(('outline', poi_id, None, size))
+
+    def circle(self, color, radius):
+        return self._surfaces.get(('circle', None, color, radius))
+
+    @property
+    def capacity(self):
+        return self._surfaces.capacity
+
+    def reserve(self, poi_count):
+        """Ajusta as caches aos 'poi_count' POIs desenhados neste frame.
+
+        Cada POI com ícone usa um par de ícones e duas superfícies tingidas; com
+        caches mais pequenas, cada frame voltaria a ler e a tingir os mesmos
+        ícones. Acima de TINTED_RESERVE_MAX_POIS as caches deixam de crescer, e
+        com menos POIs no ecrã voltam ao tamanho inicial, descartando o excesso.
+        """
+        count = min(poi_count, TINTED_RESERVE_MAX_POIS)
+        self.icon_cache.resize(max(self._icon_base, count))
+        self._surfaces.resize(max(self._surface_base, 2 * count + TINTED_CIRCLE_SLOTS))
+
+    def _render(self, key):
+        kind, poi_id, color, size = key
+        if kind == 'circle':
+            return _render_circle(color, size)
+        outline_img, fill_img = self.icon_cache.get(poi_id)
+        source = fill_img if kind == 'fill' else outline_img
+        if source.get_size() != size:
+            source = pygame.transform.smoothscale(source, size)
+        if kind == 'outline':
+            return source
+        tinted = source.copy()
+        tinted.fill(color, special_flags=pygame.BLEND_RGB_MULT)
+        return tinted
+
+
+def load_icon_pair(assets_dir, poi_id, size, icon_atlas=None):
+    """Devolve (contorno, preenchimento) do POI no tamanho pedido, ou (None, None) se não houver ícone.
+
+    Usa o atlas quando ele tem o POI; senão lê os dois ficheiros soltos. Só
+    converte para o formato do ecrã se houver janela, para servir também a
+    renderização sem janela.
+    """
+    if icon_atlas is not None:
+        icons = icon_atlas.get(poi_id, size)
+        if icons is not None:
+            return icons
+    try:
+        outline_img = pygame.image.load(os.path.join(assets_dir, f"{poi_id}_outline.png"))
+        fill_img = pygame.image.load(os.path.join(assets_dir, f"{poi_id}_fill.png"))
+        if pygame.display.get_surface():
+            outline_img, fill_img = outline_img.convert_alpha(), fill_img.convert_alpha()
+        return pygame.transform.scale(outline_img, size), pygame.transform.scale(fill_img, size)
+    except (pygame.error, FileNotFoundError):
+        _warn_missing_icon(poi_id)
+        return None, None
+
+
+def _warn_missing_icon(poi_id):
+    """Avisa uma vez por id, e só dos primeiros: bases grandes podem ter milhares de POIs sem ícone."""
+    if poi_id in _missing_icons:
+        return
+    _missing_icons.add(poi_id)
+    if len(_missing_icons) <= MISSING_ICON_WARNINGS:
+        print(f"Aviso: Ícone para '{poi_id}' não encontrado. A usar círculo como fallback.")
+    if len(_missing_icons) == MISSING_ICON_WARNINGS:
+        print("Aviso: Os próximos ícones em falta também usam círculos, mas já não são avisados.")
+
+
+def _render_circle(color, radius):
+    """Círculo de fallback (contorno preto e miolo colorido) numa superfície transparente."""
+    surface = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+    pygame.gfxdraw.filled_circle(surface, radius, radius, radius, POI_CIRCLE_OUTLINE_COLOR)
+    pygame.gfxdraw.aacircle(surface, radius, radius, radius, POI_CIRCLE_OUTLINE_COLOR)
+    pygame.gfxdraw.filled_circle(surface, radius, radius, radius - 2, color)
+    pygame.gfxdraw.aacircle(surface, radius, radius, radius - 2, color)
+    return surface
@@ -0,0 +1,125 @@
+import bisect
+import re
+import unicodedata
+
+SEARCH_MAX_RESULTS = 8 # Resultados mostrados por pesquisa
+SEARCH_MAX_WORD = 32 # Palavras mais compridas são cortadas (no índice e na pesquisa)
+WORD_PATTERN = re.compile(r'\w+')
+ACCENT_PATTERN = re.compile('[\u0300-\u036f]') # Marcas diacríticas combinantes (acentos, til, cedilha)
+
+
+# --- Normalização do Texto ---
+def fold(text):
+    """Minúsculas e sem acentos, para 'Praça'/'praca' e 'Ópera'/'opera' coincidirem."""
+    if not text.isascii():
+        text = ACCENT_PATTERN.sub('', unicodedata.normalize('NFKD', text))
+    return text.casefold()
+
+
+def fold_words(text):
+    return [word[:SEARCH_MAX_WORD] for word in WORD_PATTERN.findall(fold(text))]
+
+
+# --- Trie de Prefixos ---
+class _TrieNode:
+    __slots__ = ('children', 'rows')
+
+    def __init__(self):
+        self.children = {}
+        self.rows = [] # Ordenadas; depois de construída, todas as do nó e dos descendentes
+
+
+class PrefixTrie:
+    """Trie de palavras em que cada nó guarda as linhas com alguma palavra começada por esse prefixo.
+
+    As linhas de cada nó ficam ordenadas, por isso uma pesquisa só percorre as
+    primeiras até ter resultados suficientes, seja qual for o tamanho do índice.
+    """
+
+    def __init__(self, postings):
+        """'postings' é um dicionário palavra -> linhas (por ordem crescente)."""
+        self.root = _TrieNode()
+        for word, rows in postings.items():
+            node = self.root
+            for char in word:
+                node = node.children.setdefault(char, _TrieNode())
+            node.rows = rows
+        for child in self.root.children.values():
+            self._merge(child)
+
+    def _merge(self, node):
+        if not node.children:
+            return node.rows
+        rows = set(node.rows)
+        for child in node.children.values():
+            rows.update(self._merge(child))
+        node.rows = sorted(rows)
+        return node.rows
+
+    def find(self, prefix):
+        """Linhas (ordenadas) com alguma palavra começada por 'prefix', ou [] se não há nenhuma."""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.rows
+
+
+def _contains(rows, row):
+    i = bisect.bisect_left(rows, row)
+    return i < len(rows) and rows[i] == row
+
+
+def _intersect(row_lists, limit):
+    """Primeiras 'limit' linhas presentes em todas as listas, percorrendo só a mais curta."""
+    row_lists = sorted(row_lists, key=len)
+    shortest, others = row_lists[0], row_lists[1:]
+    found = []
+    for row in shortest:
+        if all(_contains(rows, row) for rows in others):
+            found.append(row)
+            if len(found) == limit:
+                break
+    return found
+
+
+# --- Índice de Pesquisa dos POIs ---
+class PoiSearchIndex:
+    """Índice invertido, em memória, sobre o nome e a descrição dos POIs.
+
+    Cada palavra da pesquisa é um prefixo (a última pode estar a meio de ser
+    escrita). Aparecem primeiro os POIs com todas as palavras no nome, depois
+    os que as têm no nome ou na descrição; dentro de cada grupo, por ordem
+    alfabética do nome. Internamente as linhas são numeradas por essa ordem.
+    """
+
+    def __init__(self, records):
+        """'records' é a lista (nome, descricao) dos POIs, pela ordem das linhas do jogo."""
+        folded_names = [fold(nome) for nome, descricao in records]
+        self.rank_to_row = sorted(range(len(records)), key=folded_names.__getitem__)
+        name_words, text_words = {}, {}
+        for rank, row in enumerate(self.rank_to_row):
+            nome, descricao = records[row]
+            words = set(fold_words(nome))
+            for word in words:
+                name_words.setdefault(word, []).append(rank)
+            for word in words.union(fold_words(descricao)):
+                text_words.setdefault(word, []).append(rank)
+        self.names = PrefixTrie(name_words)
+        self.texts = PrefixTrie(text_words)
+
+    def __len__(self):
+        return len(self.rank_to_row)
+
+    def search(self, query, limit=SEARCH_MAX_RESULTS):
+        """Linhas dos POIs que correspondem à pesquisa, das mais relevantes para as menos."""
+        words = fold_words(query)
+        if not words:
+            return []
+        found = _intersect([self.names.find(word) for word in words], limit)
+        if len(found) < limit:
+            in_names = set(found)
+            more = _intersect([self.texts.find(word) for word in words], limit + len(found))
+            found += [rank for rank in more if rank not in in_names][:limit - len(found)]
+        return [self.rank_to_row[rank] for rank in found]
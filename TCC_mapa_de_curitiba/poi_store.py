@@ -0,0 +1,141 @@
+"""Base de dados dos POIs (SQLite) com leitura preguiçosa dos campos pesados.
+
+Para gerar a base a partir da lista de exemplo (ou de um JSON com os mesmos campos):
+
+    python poi_store.py
+    python poi_store.py --json pontos_da_cidade.json
+"""
+import argparse
+import collections
+import json
+import os
+import pathlib
+import sqlite3
+
+POI_TEXT_CACHE_SIZE = 64 # Descrições/caminhos de imagem mantidos em memória
+
+
+# --- Cache LRU Genérica ---
+class LruCache:
+    """Guarda até 'capacity' resultados de 'loader', descartando os usados há mais tempo."""
+
+    def __init__(self, capacity, loader):
+        self.capacity = capacity
+        self.loader = loader
+        self._items = collections.OrderedDict()
+
+    def get(self, key):
+        try:
+            self._items.move_to_end(key)
+            return self._items[key]
+        except KeyError:
+            value = self.loader(key)
+            self._items[key] = value
+            if len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+            return value
+
+    def resize(self, capacity):
+        """Muda a capacidade, descartando já os itens usados há mais tempo que deixem de caber."""
+        self.capacity = capacity
+        while len(self._items) > capacity:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+
+# --- Fontes de Dados dos POIs ---
+class PoiStore:
+    """Lê os POIs de um ficheiro SQLite.
+
+    Posições, ids e nomes são carregados logo; descrição e caminho da imagem só
+    quando um cartão os pede, através de uma pequena cache.
+    """
+
+    def __init__(self, db_path):
+        uri = pathlib.Path(db_path).absolute().as_uri() + '?mode=ro'
+        self.connection = sqlite3.connect(uri, uri=True)
+        self._details = LruCache(POI_TEXT_CACHE_SIZE, self._load_details)
+
+    def load_pois(self):
+        """Devolve (index, id, nome, pos) de todos os POIs, pela ordem do índice."""
+        rows = self.connection.execute("SELECT idx, id, nome, x, y FROM pois ORDER BY idx")
+        return [(idx, poi_id, nome, (x, y)) for idx, poi_id, nome, x, y in rows]
+
+    def load_texts(self):
+        """Devolve (nome, descricao) de todos os POIs, pela ordem do índice (para o índice de pesquisa)."""
+        return self.connection.execute("SELECT nome, descricao FROM pois ORDER BY idx").fetchall()
+
+    def _load_details(self, poi_id):
+        row = self.connection.execute("SELECT descricao, imagem_path FROM pois WHERE id = ?", (poi_id,)).fetchone()
+        return row if row else ("", "")
+
+    def description(self, poi_id):
+        return self._details.get(poi_id)[0]
+
+    def image_path(self, poi_id):
+        return self._details.get(poi_id)[1]
+
+
+class MemoryPoiStore:
+    """Mesma interface do PoiStore, sobre a lista embutida (quando não há base de dados)."""
+
+    def __init__(self, records):
+        self.records = {record["id"]: record for record in records}
+        self._order = [record["id"] for record in records]
+
+    def load_pois(self):
+        return [(i, poi_id, self.records[poi_id]["nome"], self.records[poi_id]["pos"]) for i, poi_id in enumerate(self._order)]
+
+    def load_texts(self):
+        return [(self.records[poi_id]["nome"], self.records[poi_id]["descricao"]) for poi_id in self._order]
+
+    def description(self, poi_id):
+        return self.records[poi_id]["descricao"]
+
+    def image_path(self, poi_id):
+        return self.records[poi_id]["imagem_path"]
+
+
+def open_poi_store(db_path, fallback_records):
+    """Abre a base SQLite se existir; senão usa os dados embutidos."""
+    if os.path.isfile(db_path):
+        try:
+            return PoiStore(db_path)
+        except sqlite3.Error as e:
+            print(f"Não foi possível abrir '{db_path}' ({e}). A usar os POIs embutidos.")
+    return MemoryPoiStore(fallback_records)
+
+
+# --- Construção da Base de Dados ---
+def build_poi_database(records, db_path):
+    """Escreve os POIs numa base SQLite nova, pela ordem da lista."""
+    tmp_path = db_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    with connection:
+        connection.execute("CREATE TABLE pois (idx INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, nome TEXT NOT NULL,"
+                           " x REAL NOT NULL, y REAL NOT NULL, descricao TEXT NOT NULL, imagem_path TEXT NOT NULL)")
+        connection.executemany("INSERT INTO pois VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               [(i, r["id"], r["nome"], r["pos"][0], r["pos"][1], r.get("descricao", ""), r.get("imagem_path", ""))
+                                for i, r in enumerate(records)])
+    connection.close()
+    os.replace(tmp_path, db_path)
+    print(f"{len(records)} POIs escritos em '{db_path}'.")
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Gera a base de dados de POIs do mapa interativo.")
+    parser.add_argument('--json', help="Ficheiro JSON com uma lista de POIs (id, nome, pos, descricao, imagem_path)")
+    parser.add_argument('--out', default=os.path.join(base_path, 'assets', 'pois.sqlite'))
+    args = parser.parse_args()
+    if args.json:
+        with open(args.json, encoding='utf-8') as f:
+            poi_records = json.load(f)
+    else:
+        from pontos_turisticos import PONTOS_TURISTICOS_DATA
+        poi_records = PONTOS_TURISTICOS_DATA
+    build_poi_database(poi_records, args.out)
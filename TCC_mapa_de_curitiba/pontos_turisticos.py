@@ -0,0 +1,28 @@
+# --- Dados dos Pontos Turísticos (Exemplos) ---
+PONTOS_TURISTICOS_DATA = [
+    { "id": "praca_tiradentes", "nome": "Praça Tiradentes", "pos": (8935, 5691), "descricao": "Localizada no coração do centro histórico de Curitiba, a Praça Tiradentes é um marco da cidade. É cercada por importantes edifícios históricos e é um ponto de encontro popular para eventos culturais e sociais. É a principal de Curitiba, dominada pela Catedral Basílica Menor de Nossa Senhora da Luz, centenária em 1993. Nesta região, em 29 de março de 1693, foi fundada Curitiba. Antigamente conhecida como Largo da Matriz, a praça é o marco zero da cidade. Em 1880, em função da visita do Imperador Pedro II ao Paraná, o Largo passou a se chamar D. Pedro II. Nove anos mais tarde, com a Proclamação da República, recebeu o nome atual de Praça Tiradentes. É um importante terminal de transporte coletivo.", "imagem_path": "" },
+    { "id": "rua_flores", "nome": "Rua das Flores", "pos": (9119, 5683), "descricao": "A Rua das Flores é uma charmosa rua de pedestres no centro de Curitiba, famosa por suas flores e árvores. É um ótimo lugar para passear, fazer compras e apreciar a arquitetura local.", "imagem_path": "" },
+    { "id": "rua_24_horas", "nome": "Rua 24 Horas", "pos": (8760, 5904), "descricao": "Uma rua coberta que funciona 24 horas por dia, oferecendo uma variedade de lojas, restaurantes e cafés. É um local popular tanto para moradores quanto para turistas.", "imagem_path": "" },
+    { "id": "museu_ferroviario", "nome": "Museu Ferroviário", "pos": (9178, 6029), "descricao": "O Museu Ferroviário de Curitiba é dedicado à história das ferrovias no Brasil. O museu abriga uma coleção de locomotivas, vagões e outros artefatos ferroviários, além de exposições sobre a história do transporte ferroviário.", "imagem_path": ""},
+    { "id": "teatro_paiol", "nome": "Teatro Paiol", "pos": (9481, 6451), "descricao": "Localizado em um antigo paiol de pólvora, o Teatro Paiol é um espaço cultural que abriga peças de teatro, shows e eventos culturais. É conhecido por sua acústica excepcional e ambiente intimista.", "imagem_path": "" },
+    { "id": "jardim_botanico", "nome": "Jardim Botânico", "pos": (10225, 6227), "descricao": "O Jardim Botânico de Curitiba, inaugurado em 1991, é um dos principais pontos turísticos da cidade. A sua estufa de metal e vidro, inspirada no Palácio de Cristal de Londres, é o seu marco mais famoso e abriga espécies botânicas da Floresta Atlântica.", "imagem_path": "" },
+    { "id": "mercado_municipal", "nome": "Mercado Municipal", "pos": (9503, 5909), "descricao": "O Mercado Municipal de Curitiba é um local vibrante onde você pode encontrar uma variedade de produtos frescos, especiarias, artesanato e comidas típicas. É um ótimo lugar para experimentar a culinária local e comprar lembranças.", "imagem_path": "" },
+    { "id": "teatro_guaira", "nome": "Teatro Guaíra", "pos": (9190, 5637), "descricao": "Um dos principais teatros do Brasil, o Teatro Guaíra é conhecido por sua arquitetura imponente e por abrigar uma variedade de eventos culturais, incluindo óperas, balés e concertos. É um símbolo da vida cultural de Curitiba.", "imagem_path": "" },
+    { "id": "palacio_liberdade", "nome": "Paço da Liberdade", "pos": (9010, 5701), "descricao": "O Palácio da Liberdade é a sede do governo do estado do Paraná. Sua arquitetura neoclássica e os jardins bem cuidados fazem dele um local de visitação popular, especialmente durante eventos culturais e exposições.", "imagem_path": "" },
+    { "id": "passeio_publico", "nome": "Passeio Público", "pos": (9108, 5512), "descricao": "O Passeio Público é um dos parques mais antigos de Curitiba, inaugurado em 1886. É um espaço verde com lagos, pontes e áreas para piqueniques, ideal para relaxar e apreciar a natureza no coração da cidade.", "imagem_path": "" },
+    { "id": "centro_civico", "nome": "Centro Cívico", "pos": (9048, 5169), "descricao": "O Centro Cívico é o coração político de Curitiba, onde estão localizados o Palácio Iguaçu, a Assembleia Legislativa e outros edifícios governamentais. É um local importante para eventos cívicos e manifestações.", "imagem_path": "" },
+    { "id": "museu_olho", "nome": "Museu Oscar Niemeyer", "pos": (9111, 4876), "descricao": "Popularmente conhecido como Museu do Olho, devido ao design de sua torre, é um espaço dedicado à exposição de Artes Visuais, Arquitetura e Design. Projetado por Oscar Niemeyer, é um dos maiores complexos de exposição da América Latina.", "imagem_path": "" },     
+    { "id": "bosque_papa", "nome": "Bosque do Papa", "pos": (9000, 4792), "descricao": "Um parque dedicado ao Papa João Paulo II, com uma trilha de caminhada, lago e áreas para piqueniques. É um local tranquilo para relaxar e apreciar a natureza, além de abrigar uma réplica da Capela de São Miguel.", "imagem_path": "" },
+    { "id": "bosque_alemao", "nome": "Bosque Alemão", "pos": (8332, 4646), "descricao": "Um parque temático que celebra a cultura alemã em Curitiba. Possui uma trilha de caminhada, um mirante e uma réplica de uma casa típica alemã. É um ótimo lugar para aprender sobre a história da imigração alemã na região.", "imagem_path": "" },
+    { "id": "universidade_meio_ambiente", "nome": "UNILIVRE", "pos": (8492, 4335), "descricao": "Um espaço educacional dedicado à preservação ambiental e sustentabilidade. Oferece cursos, palestras e atividades voltadas para a conscientização ambiental, além de um belo jardim botânico.", "imagem_path": "" },
+    { "id": "parque_lourenco", "nome": "Parque São Lourenço", "pos": (9123, 3710), "descricao": "Um parque urbano com áreas verdes, lago e trilhas para caminhada. É um local popular para atividades ao ar livre, como caminhadas, corridas e piqueniques, além de abrigar eventos culturais e esportivos.", "imagem_path": "" },
+    { "id": "opera_arame", "nome": "Ópera de Arame", "pos": (8760, 3816), "descricao": "Com uma estrutura tubular de aço e teto transparente, a Ópera de Arame é um dos espaços de espetáculos mais emblemáticos do Brasil. Foi construída em apenas 75 dias e inaugurada em 1992, em meio a um lago e vegetação nativa.", "imagem_path": "" },
+    { "id": "parque_tangua", "nome": "Parque Tanguá", "pos": (8548, 3593), "descricao": "Um parque urbano com lago, cascata e mirante. É um local popular para caminhadas, corridas e piqueniques, além de oferecer vistas panorâmicas da cidade.", "imagem_path": "" },
+    { "id": "parque_tingui", "nome": "Parque Tingui", "pos": (7648, 4204), "descricao": "Um parque urbano com áreas verdes, lago e trilhas para caminhada. É um local popular para atividades ao ar livre, como caminhadas, corridas e piqueniques, além de abrigar eventos culturais e esportivos.", "imagem_path": "" },
+    { "id": "memorial_ucraniano", "nome": "Memorial Ucraniano", "pos": (7678, 4545), "descricao": "Um espaço cultural dedicado à preservação da cultura ucraniana em Curitiba. O memorial abriga uma capela, um museu e um centro cultural, além de eventos e festivais que celebram a cultura ucraniana.", "imagem_path": "" },
+    { "id": "portal_italiano", "nome": "Portal Italiano", "pos": (7747, 5079), "descricao": "Um monumento que celebra a imigração italiana em Curitiba. O portal é uma réplica de uma construção típica italiana e é um local popular para fotos e eventos culturais.", "imagem_path": "" },
+    { "id": "santa_felicidade", "nome": "Santa Felicidade", "pos": (6588, 4495), "descricao": "Um bairro tradicional de Curitiba, conhecido por sua forte influência italiana. É famoso por seus restaurantes, vinícolas e lojas de artesanato, além de ser um ótimo lugar para experimentar a culinária italiana.", "imagem_path": "" },
+    { "id": "parque_barigui", "nome": "Parque Barigui", "pos": (7605, 5549), "descricao": "Um dos maiores parques urbanos de Curitiba, o Parque Barigui é um local popular para caminhadas, corridas e piqueniques. Possui um lago, áreas verdes e uma pista de caminhada ao redor do parque.", "imagem_path": "" },
+    { "id": "torre_panoramica", "nome": "Torre Panorâmica", "pos": (8099, 5482), "descricao": "Uma torre de observação que oferece vistas panorâmicas da cidade. É um local popular para turistas e moradores, especialmente ao pôr do sol.", "imagem_path": "" },
+    { "id": "centro_historico", "nome": "Centro Histórico", "pos": (8930, 5590), "descricao": "O Centro Histórico de Curitiba é uma área que preserva a arquitetura colonial e a história da cidade. É um local popular para passeios a pé, com várias lojas, restaurantes e museus.", "imagem_path": "" },
+]
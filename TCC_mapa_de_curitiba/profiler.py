@@ -0,0 +1,180 @@
+"""Medição do tempo de cada fase do frame, com HUD (tecla F3) e exportação periódica para disco.
+
+Desligado, cada ponto de medição custa só uma chamada que devolve None. A
+recolha e a exportação (por exemplo numa máquina de produção) ligam-se com
+MAPA_PROFILE=1, sem mostrar nada no ecrã; os ficheiros 'frame_times.csv' e
+'frame_summary.json' são escritos na pasta de dados do utilizador, em
+'profiling'. O F3 só mostra/esconde o HUD e não mexe na exportação.
+"""
+import csv
+import json
+import os
+import time
+
+import pygame
+
+FRAME_HISTORY = 600 # Frames guardados no buffer circular (~10 s a 60 FPS)
+PROFILE_EXPORT_INTERVAL = 10000 # Milissegundos entre exportações enquanto o profiler está ligado
+HUD_AVERAGE_FRAMES = 60 # Frames usados nas médias mostradas no HUD
+HUD_POSITION = (10, 10)
+PHASES = ('events', 'update', 'map_scale', 'map_blit', 'fog_scale', 'fog_blit', 'pois', 'minimap', 'card', 'flip', 'total')
+
+
+# --- Buffer Circular de Tempos por Fase ---
+class FrameProfiler:
+    """Acumula os milissegundos de cada fase do frame atual e guarda os últimos frames num buffer circular.
+
+    Uso: t = profiler.start(); ...; t = profiler.stop('fase', t). O valor
+    devolvido por stop serve de início à fase seguinte.
+    """
+
+    def __init__(self, capacity=FRAME_HISTORY, enabled=False, show_hud=False):
+        self.enabled = enabled # Recolhe e exporta periodicamente
+        self.show_hud = show_hud # Só o painel no ecrã; também precisa dos tempos, mas não exporta
+        self.capacity = capacity
+        self.history = [[0.0] * len(PHASES) for _ in range(capacity)]
+        self.count = 0 # Total de frames registados desde o início
+        self.current = [0.0] * len(PHASES)
+        self._phase_index = {phase: i for i, phase in enumerate(PHASES)}
+        self.export_dir = None
+        self.last_export = 0
+
+    @property
+    def measuring(self):
+        return self.enabled or self.show_hud
+
+    def start(self):
+        return time.perf_counter() if self.measuring else None
+
+    def stop(self, phase, start):
+        if start is None:
+            return None
+        now = time.perf_counter()
+        self.current[self._phase_index[phase]] += (now - start) * 1000
+        return now
+
+    def toggle(self):
+        """Mostra/esconde o HUD; a recolha para exportação (enabled) continua como estava."""
+        self.show_hud = not self.show_hud
+        if not self.enabled:
+            self.current = [0.0] * len(PHASES) # A medição começa/acaba a meio de um frame
+
+    def take_current(self):
+        """Devolve os tempos acumulados desde a última chamada (por fase) e recomeça do zero."""
+        current = dict(zip(PHASES, self.current))
+        self.current = [0.0] * len(PHASES)
+        return current
+
+    def end_frame(self, frame_start):
+        """Fecha o frame começado em 'frame_start' e passa-o para o buffer circular."""
+        if frame_start is None:
+            return
+        self.stop('total', frame_start)
+        self.history[self.count % self.capacity][:] = self.current
+        self.current = [0.0] * len(PHASES)
+        self.count += 1
+
+    def recent(self, frames=None):
+        """Os últimos 'frames' registos (por omissão, todo o buffer), do mais antigo para o mais recente."""
+        available = min(self.count, self.capacity)
+        frames = available if frames is None else min(frames, available)
+        return [self.history[i % self.capacity] for i in range(self.count - frames, self.count)]
+
+    def averages(self, frames=HUD_AVERAGE_FRAMES):
+        rows = self.recent(frames)
+        if not rows:
+            return [0.0] * len(PHASES)
+        return [sum(column) / len(rows) for column in zip(*rows)]
+
+    # --- Exportação ---
+    def maybe_export(self, now_ms):
+        """Exporta o buffer a cada PROFILE_EXPORT_INTERVAL milissegundos enquanto a recolha estiver ligada."""
+        if not self.enabled or now_ms - self.last_export < PROFILE_EXPORT_INTERVAL:
+            return
+        self.last_export = now_ms
+        if self.export_dir is None:
+            from user_paths import user_data_dir
+            self.export_dir = user_data_dir('profiling')
+        try:
+            self.export(self.export_dir)
+        except OSError as e:
+            print(f"Não foi possível exportar os tempos dos frames ({e}).")
+            self.enabled = False
+
+    def export(self, directory):
+        """Escreve o buffer em CSV (um frame por linha) e um resumo por fase em JSON."""
+        rows = self.recent()
+        csv_path = os.path.join(directory, 'frame_times.csv')
+        with open(csv_path + '.tmp', 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(('frame',) + PHASES)
+            first = self.count - len(rows)
+            for i, row in enumerate(rows):
+                writer.writerow([first + i] + [f"{value:.3f}" for value in row])
+        os.replace(csv_path + '.tmp', csv_path)
+
+        summary = {"frames": len(rows), "exported_at": time.time(), "phases_ms": {}}
+        for phase, column in zip(PHASES, zip(*rows)):
+            ordered = sorted(column)
+            summary["phases_ms"][phase] = {
+                "mean": sum(ordered) / len(ordered),
+                "p50": ordered[len(ordered) // 2],
+                "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+                "max": ordered[-1],
+            }
+        json_path = os.path.join(directory, 'frame_summary.json')
+        with open(json_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        os.replace(json_path + '.tmp', json_path)
+
+    # --- HUD ---
+    def draw_hud(self, target, font, fps):
+        """Desenha no canto superior esquerdo o FPS e a média de cada fase nos últimos frames."""
+        target.blit(self.render_hud(font, fps), HUD_POSITION)
+
+    def render_hud(self, font, fps):
+        """Painel do HUD como superfície transparente (o backend de texturas envia-o como textura)."""
+        rows = [("FPS", f"{fps:.1f}")]
+        rows += [(phase, f"{value:.2f} ms") for phase, value in zip(PHASES, self.averages())]
+        line_height = font.get_linesize()
+        rendered = [(font.render(label, True, (255, 255, 255)), font.render(value, True, (255, 255, 255)))
+                    for label, value in rows]
+        label_width = max(label.get_width() for label, _ in rendered)
+        value_width = max(value.get_width() for _, value in rendered)
+        panel = pygame.Surface((label_width + value_width + 28, line_height * len(rows) + 12), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, (label, value) in enumerate(rendered):
+            y = 6 + i * line_height
+            panel.blit(label, (8, y))
+            panel.blit(value, (panel.get_width() - 8 - value.get_width(), y)) # Valores alinhados à direita
+        return panel
+
+
+# --- Relatório de Arranque ---
+class StartupReport:
+    """Regista a duração de cada etapa do arranque e resume o tempo até ao primeiro frame.
+
+    Conta a partir da criação do relatório (o início de Game.__init__), por
+    isso as importações dos módulos não entram no total.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.steps = []
+
+    def mark(self, step):
+        """Fecha a etapa 'step', que durou desde a marca anterior."""
+        now = time.perf_counter()
+        self.steps.append((step, (now - self.last) * 1000))
+        self.last = now
+
+    def total_ms(self):
+        return (self.last - self.start) * 1000
+
+    def summary(self):
+        steps = ", ".join(f"{step} {ms:.0f} ms" for step, ms in self.steps)
+        return f"Primeiro frame {self.total_ms():.0f} ms após a criação do jogo, sem as importações ({steps})."
+
+
+frame_profiler = FrameProfiler(enabled=os.environ.get('MAPA_PROFILE') == '1')
@@ -0,0 +1,73 @@
+"""Gravação compacta do progresso da exploração.
+
+Em vez da névoa (mais de um gigabyte em pixels), guarda-se o estado dos POIs
+como bitsets (bit i = POI de índice i) e a lista de círculos revelados; a
+névoa é reconstruída a partir dos círculos ao arrancar.
+"""
+import base64
+import json
+import os
+from user_paths import user_data_dir
+
+PROGRESS_VERSION = 1
+PROGRESS_FILE_NAME = 'progresso.json'
+
+
+def default_progress_path():
+    return os.path.join(user_data_dir(), PROGRESS_FILE_NAME)
+
+
+# --- Bitsets ---
+def pack_bits(indices):
+    """Converte um conjunto de índices num bitset em base64."""
+    value = 0
+    for i in indices:
+        value |= 1 << i
+    return base64.b64encode(value.to_bytes((value.bit_length() + 7) // 8, 'little')).decode('ascii')
+
+
+def unpack_bits(text):
+    value = int.from_bytes(base64.b64decode(text), 'little')
+    return {i for i, bit in enumerate(reversed(bin(value)[2:])) if bit == '1'}
+
+
+# --- Gravação e Leitura ---
+def save_progress(path, pois, reveal_circles, camera):
+    """Escreve o progresso de forma atómica (ficheiro temporário + substituição)."""
+    data = {
+        "version": PROGRESS_VERSION,
+        "poi_count": len(pois),
+        "completed": pack_bits(poi.index for poi in pois if poi.is_completed),
+        "visible": pack_bits(poi.index for poi in pois if poi.is_visible),
+        "reveals": [list(circle) for circle in reveal_circles],
+        "camera": [camera.x, camera.y, camera.width],
+    }
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Não foi possível gravar o progresso em '{path}' ({e}).")
+
+
+def load_progress(path):
+    """Devolve o progresso gravado, ou None se não existir ou estiver noutro formato."""
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != PROGRESS_VERSION:
+            print(f"O progresso em '{path}' é de outra versão. A começar do início.")
+            return None
+        return {
+            "poi_count": data["poi_count"],
+            "completed": unpack_bits(data["completed"]),
+            "visible": unpack_bits(data["visible"]),
+            "reveals": [tuple(circle) for circle in data["reveals"]],
+            "camera": tuple(data["camera"]) if data.get("camera") else None,
+        }
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Não foi possível ler o progresso em '{path}' ({e}). A começar do início.")
+        return None
@@ -0,0 +1,65 @@
+import math
+
+POI_GRID_CELL_SIZE = 512 # Lado de cada célula da grelha, em pixels do mapa
+
+
+# --- Índice Espacial dos POIs (grelha uniforme) ---
+class PoiGrid:
+    """Agrupa os POIs por células do mapa para que as pesquisas só olhem para as células tocadas.
+
+    Os resultados vêm sempre ordenados pelo índice do POI, para que desenho e
+    cliques sigam a mesma ordem da lista original.
+    """
+
+    def __init__(self, cell_size=POI_GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {} # (cx, cy) -> lista de POIs
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, poi):
+        self.cells.setdefault(self._cell(poi.map_pos[0], poi.map_pos[1]), []).append(poi)
+
+    def _candidates(self, left, top, right, bottom):
+        cx0, cy0 = self._cell(left, top)
+        cx1, cy1 = self._cell(right, bottom)
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                yield from self.cells.get((cx, cy), ())
+
+    def query_rect(self, map_rect):
+        """POIs cuja posição está dentro do retângulo (por exemplo, a câmara)."""
+        found = [poi for poi in self._candidates(map_rect.left, map_rect.top, map_rect.right, map_rect.bottom)
+                 if map_rect.collidepoint(poi.map_pos)]
+        found.sort(key=lambda poi: poi.index)
+        return found
+
+    def query_radius(self, center, radius):
+        """POIs a uma distância exata de no máximo 'radius' do centro."""
+        cx, cy = center[0], center[1]
+        r2 = radius * radius
+        found = [poi for poi in self._candidates(cx - radius, cy - radius, cx + radius, cy + radius)
+                 if (poi.map_pos[0] - cx) ** 2 + (poi.map_pos[1] - cy) ** 2 <= r2]
+        found.sort(key=lambda poi: poi.index)
+        return found
+
+    def pick(self, screen_pos, map_pos, map_radius, predicate=None):
+        """Devolve o primeiro POI cujo rect no ecrã contém 'screen_pos'.
+
+        'map_pos' é o mesmo ponto convertido para o mapa e 'map_radius' a maior
+        distância (em pixels do mapa) a que um ícone ainda pode cobrir esse ponto.
+        """
+        x, y = map_pos[0], map_pos[1]
+        candidates = sorted(self._candidates(x - map_radius, y - map_radius, x + map_radius, y + map_radius),
+                            key=lambda poi: poi.index)
+        for poi in candidates:
+            if (predicate is None or predicate(poi)) and poi.rect.collidepoint(screen_pos):
+                return poi
+        return None
+
+
+def icon_pick_radius(icon_size, shake_magnitude, scale):
+    """Raio no mapa que cobre metade da diagonal do ícone mais o tremor máximo."""
+    half_diagonal = math.hypot(icon_size[0], icon_size[1]) / 2
+    return (half_diagonal + shake_magnitude) / scale
@@ -0,0 +1,107 @@
+import pygame
+from poi_store import LruCache
+
+TEXT_BLOCK_CACHE_SIZE = 32 # Blocos de texto já renderizados mantidos em memória
+KERNING_SLACK = 4 # Perto do limite, a soma das larguras pode diferir da linha real por alguns pixels
+
+
+# --- Métricas de Palavras por Fonte ---
+class FontMetrics:
+    """Guarda a largura de cada palavra já medida numa fonte."""
+
+    def __init__(self, font):
+        self.font = font
+        self.space_width = font.size(" ")[0]
+        self._widths = {}
+
+    def width(self, word):
+        width = self._widths.get(word)
+        if width is None:
+            width = self.font.size(word)[0]
+            self._widths[word] = width
+        return width
+
+
+_metrics = {}
+
+
+def metrics_for(font):
+    metrics = _metrics.get(font)
+    if metrics is None:
+        metrics = _metrics[font] = FontMetrics(font)
+    return metrics
+
+
+# --- Quebra de Linhas ---
+def _split_long_word(word, metrics, max_width):
+    """Parte uma palavra mais larga que a linha em pedaços que cabem (pesquisa binária no corte)."""
+    pieces = []
+    while word:
+        low, high = 1, len(word)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if metrics.font.size(word[:mid])[0] < max_width:
+                low = mid
+            else:
+                high = mid - 1
+        pieces.append(word[:low])
+        word = word[low:]
+    return pieces
+
+
+def wrap_text(text, font, max_width):
+    """Quebra o texto em linhas com um algoritmo guloso linear no número de palavras.
+
+    Cada parágrafo (separado por '\\n') começa numa linha nova; as larguras das
+    palavras vêm da cache da fonte, por isso cada palavra só é medida uma vez.
+    """
+    metrics = metrics_for(font)
+    lines = []
+    for paragraph in text.split('\n'):
+        current_words = []
+        current_width = 0
+        for word in paragraph.split(' '):
+            word_width = metrics.width(word)
+            if word_width >= max_width:
+                # Como antes, a palavra longa fica sozinha: cada pedaço (também o último) tem a sua linha
+                if current_words:
+                    lines.append(" ".join(current_words))
+                lines.extend(_split_long_word(word, metrics, max_width))
+                current_words, current_width = [], 0
+                continue
+            # Tal como antes, a linha tem de caber com o espaço final incluído
+            line_width = current_width + word_width + metrics.space_width
+            if abs(line_width - max_width) <= KERNING_SLACK:
+                line_width = font.size(" ".join(current_words) + " " * bool(current_words) + word + " ")[0]
+            if current_words and line_width >= max_width:
+                lines.append(" ".join(current_words))
+                current_words, current_width = [], 0
+            current_words.append(word)
+            current_width += word_width + metrics.space_width
+        lines.append(" ".join(current_words).strip())
+    return lines
+
+
+# --- Blocos de Texto Renderizados ---
+def _render_block(key):
+    _, text, font, max_width, color = key
+    lines = wrap_text(text, font, max_width)
+    line_height = font.get_linesize()
+    surface = pygame.Surface((max_width, max(1, len(lines) * line_height)), pygame.SRCALPHA)
+    y = 0
+    for line in lines:
+        if line:
+            surface.blit(font.render(line, True, color), (0, y))
+        y += line_height
+    return surface
+
+
+_rendered_blocks = LruCache(TEXT_BLOCK_CACHE_SIZE, _render_block)
+
+
+def render_text_block(block_id, text, font, max_width, color):
+    """Devolve o texto já quebrado e renderizado, reutilizado por (id, fonte, largura, cor).
+
+    A superfície devolvida é partilhada e não deve ser alterada.
+    """
+    return _rendered_blocks.get((block_id, text, font, max_width, color))
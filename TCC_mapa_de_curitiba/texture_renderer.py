@@ -0,0 +1,135 @@
+"""Backend de desenho por texturas (pygame._sdl2.video), alternativo aos blits por software.
+
+Escolhe-se com a variável de ambiente MAPA_RENDERER:
+
+    MAPA_RENDERER=texture    # renderer acelerado do SDL se existir, senão o de software
+    MAPA_RENDERER=software   # força o renderer por software do SDL (máquinas sem GPU, testes)
+
+Tiles do mapa, tiles parciais da névoa, ícones e cartão são enviados uma vez
+como texturas e desenhados já com a posição e o tamanho do ecrã: zoom, escala
+e fade do cartão passam a ser parâmetros do desenho. Enquanto há uma
+revelação a decorrer a névoa muda a cada frame, por isso esses frames são
+compostos por software, como no backend normal, e enviados inteiros.
+"""
+import collections
+import pygame
+from pygame._sdl2.video import Window, Renderer, Texture
+from profiler import frame_profiler, HUD_POSITION
+from minimap import MINIMAP_VIEW_COLOR
+
+MAP_TEXTURE_CACHE_SIZE = 512 # Tiles/blocos do mapa mantidos como textura (~128 MB com 256x256)
+FOG_TEXTURE_CACHE_SIZE = 256 # Tiles parciais da névoa
+ICON_TEXTURE_CACHE_SIZE = 512 # Igual a TINTED_ICON_CACHE_SIZE (e acompanha-a): uma textura por ícone tingido
+CARD_TEXTURE_CACHE_SIZE = 4 # Cada estado do cartão (scroll, botão) é uma textura de ~1 MB
+UI_TEXTURE_CACHE_SIZE = 4 # Minimapa e caixa de pesquisa (esta muda a cada tecla)
+
+
+# --- Cache de Texturas ---
+class TextureCache:
+    """Texturas por chave, descartando as usadas há mais tempo.
+
+    Ao contrário de LruCache, a superfície só é pedida (e enviada) quando a
+    textura ainda não existe, e pode não haver superfície: aí devolve None.
+    """
+
+    def __init__(self, renderer, capacity):
+        self.renderer = renderer
+        self.capacity = capacity
+        self._textures = collections.OrderedDict()
+
+    def get(self, key, make_surface):
+        texture = self._textures.get(key)
+        if texture is not None:
+            self._textures.move_to_end(key)
+            return texture
+        surface = make_surface()
+        if surface is None:
+            return None
+        texture = Texture.from_surface(self.renderer, surface)
+        self._textures[key] = texture
+        if len(self._textures) > self.capacity:
+            self._textures.popitem(last=False)
+        return texture
+
+    def resize(self, capacity):
+        """Muda a capacidade, descartando já as texturas usadas há mais tempo que deixem de caber."""
+        self.capacity = capacity
+        while len(self._textures) > capacity:
+            self._textures.popitem(last=False)
+
+    def clear(self):
+        self._textures.clear()
+
+
+# --- Janela com Renderer do SDL ---
+class TextureRenderer:
+    """Janela própria com um Renderer do SDL (não pode partilhar a janela de pygame.display.set_mode)."""
+
+    def __init__(self, title, size, background_color, software=False):
+        self.window = Window(title, size, resizable=True)
+        # accelerated=-1 deixa o SDL escolher (acelerado quando existe); 0 força o renderer por software
+        self.renderer = Renderer(self.window, accelerated=0 if software else -1)
+        self.background_color = background_color
+        self.map_textures = TextureCache(self.renderer, MAP_TEXTURE_CACHE_SIZE)
+        self.fog_textures = TextureCache(self.renderer, FOG_TEXTURE_CACHE_SIZE)
+        self.icon_textures = TextureCache(self.renderer, ICON_TEXTURE_CACHE_SIZE)
+        self.card_textures = TextureCache(self.renderer, CARD_TEXTURE_CACHE_SIZE)
+        self.ui_textures = TextureCache(self.renderer, UI_TEXTURE_CACHE_SIZE)
+        self._scene = None # Frame composto por software durante as revelações
+
+    def set_icon(self, surface):
+        self.window.set_icon(surface)
+
+    def draw_frame(self, game, scale, reveal_holes):
+        """Desenha mapa, névoa, POIs, cartão e HUD do jogo no renderer (falta present())."""
+        renderer = self.renderer
+        renderer.draw_color = pygame.Color(self.background_color)
+        renderer.clear()
+        if reveal_holes:
+            self._draw_software_scene(game, scale, reveal_holes)
+        else:
+            t = frame_profiler.start()
+            game.map_source.draw_textured(self.map_textures, game.camera, scale)
+            t = frame_profiler.stop('map_blit', t)
+            game.fog.draw_textured(self.fog_textures, game.camera, scale)
+            frame_profiler.stop('fog_blit', t)
+
+        # Os mesmos pares (superfície, posição) do backend normal; cada superfície tingida vira uma textura
+        t = frame_profiler.start()
+        self.icon_textures.resize(max(ICON_TEXTURE_CACHE_SIZE, game.tinted_icons.capacity))
+        for row in game.visible_rows:
+            for surface, pos in game.poi_list[row].blit_items(game.tinted_icons):
+                texture = self.icon_textures.get(surface, lambda: surface)
+                texture.draw(dstrect=(pos[0], pos[1], texture.width, texture.height))
+        t = frame_profiler.stop('pois', t)
+
+        minimap = game.minimap
+        surface = minimap.surface()
+        self.ui_textures.get(surface, lambda: surface).draw(dstrect=minimap.rect)
+        renderer.draw_color = pygame.Color(MINIMAP_VIEW_COLOR)
+        view = minimap.view_rect(game.camera)
+        renderer.draw_rect(view)
+        renderer.draw_rect(view.inflate(-2, -2)) # Contorno de 2 pixels, como no backend normal
+        t = frame_profiler.stop('minimap', t)
+
+        if game.active_card:
+            game.active_card.draw_textured(self.card_textures)
+        if game.search_bar:
+            surface = game.search_bar.surface()
+            self.ui_textures.get(surface, lambda: surface).draw(dstrect=game.search_bar.rect)
+        frame_profiler.stop('card', t)
+
+        if frame_profiler.show_hud:
+            panel = frame_profiler.render_hud(game.font_hud, game.clock.get_fps())
+            Texture.from_surface(renderer, panel).draw(dstrect=(HUD_POSITION, panel.get_size()))
+
+    def _draw_software_scene(self, game, scale, reveal_holes):
+        if self._scene is None or self._scene.get_size() != game.screen_size:
+            self._scene = pygame.Surface(game.screen_size)
+        self._scene.fill(self.background_color)
+        game.map_source.draw(self._scene, game.camera, scale)
+        game.fog.draw(self._scene, game.camera, scale, reveal_holes)
+        Texture.from_surface(self.renderer, self._scene).draw()
+
+    def present(self):
+        self.renderer.present()
@@ -0,0 +1,200 @@
+"""Cache de tiles do mapa em disco, pré-processada offline e lida com mmap.
+
+Para gerar a cache (só é preciso repetir quando o mapa ou a névoa mudam):
+
+    python tile_cache.py
+
+Os ficheiros ficam em assets/tile_cache, por isso são incluídos no executável
+do PyInstaller junto com o resto da pasta 'assets'.
+"""
+import argparse
+import json
+import math
+import mmap
+import os
+import pygame
+from fog import FogLayer, CLEARED
+from map_pyramid import MapPyramid, choose_level
+from profiler import frame_profiler
+from parallel_scale import scale_pool
+from viewport import camera_render_rect, snap_to_screen
+
+TILE_CACHE_VERSION = 1
+TILE_CACHE_TILE_SIZE = 256
+TILE_INDEX_FILE = 'index.json'
+MAP_TILE_FORMAT = 'RGB'  # 3 bytes por pixel, sem compressão
+FOG_TILE_FORMAT = 'RGBA' # 4 bytes por pixel, sem compressão
+
+
+# --- Leitura da Cache em Tempo de Execução ---
+class TileCache:
+    """Mapeia em memória os ficheiros de tiles e devolve superfícies sob pedido.
+
+    Nada é lido do disco no arranque: o sistema operativo só carrega as páginas
+    dos tiles que efetivamente são desenhados.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, TILE_INDEX_FILE), encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != TILE_CACHE_VERSION:
+            raise ValueError(f"Versão da cache de tiles não suportada: {index.get('version')}")
+        self.tile_size = index['tile_size']
+        self.map_size = tuple(index['map_size'])
+        self.map_rect = pygame.Rect((0, 0), self.map_size)
+        self.levels = index['levels']
+        self.fog_index = index['fog']
+        self._files = []
+        self._maps = [self._open_map(level['file'], mmap.ACCESS_READ) for level in self.levels]
+
+    @staticmethod
+    def exists(cache_dir):
+        return os.path.isfile(os.path.join(cache_dir, TILE_INDEX_FILE))
+
+    def _open_map(self, file_name, access):
+        f = open(os.path.join(self.cache_dir, file_name), 'rb')
+        self._files.append(f)
+        return mmap.mmap(f.fileno(), 0, access=access)
+
+    def choose_level(self, map_pixels_per_screen_pixel):
+        return choose_level(map_pixels_per_screen_pixel, len(self.levels))
+
+    def level_tile_rect(self, level, tx, ty):
+        """Retângulo do tile em coordenadas do próprio nível."""
+        ts = self.tile_size
+        level_w, level_h = self.levels[level]['size']
+        return pygame.Rect(tx * ts, ty * ts, ts, ts).clip(pygame.Rect(0, 0, level_w, level_h))
+
+    def tile(self, level, tx, ty):
+        """Embrulha os bytes do tile numa Surface, sem copiar."""
+        info = self.levels[level]
+        rect = self.level_tile_rect(level, tx, ty)
+        stride = self.tile_size * self.tile_size * len(MAP_TILE_FORMAT)
+        offset = (ty * info['cols'] + tx) * stride
+        length = rect.width * rect.height * len(MAP_TILE_FORMAT)
+        data = memoryview(self._maps[level])[offset:offset + length]
+        return pygame.image.frombuffer(data, rect.size, MAP_TILE_FORMAT)
+
+    def level_surface(self, level):
+        """Junta todos os tiles de um nível numa só Surface (só para os níveis pequenos)."""
+        info = self.levels[level]
+        surface = pygame.Surface(info['size'])
+        for ty in range(info['rows']):
+            for tx in range(info['cols']):
+                surface.blit(self.tile(level, tx, ty), self.level_tile_rect(level, tx, ty))
+        return surface
+
+    def visible_tiles(self, level, camera):
+        """Devolve (tx, ty, bordas_no_mapa) de cada tile do nível visível pela câmara."""
+        render_rect = camera_render_rect(camera, self.map_rect)
+        if render_rect.width <= 0 or render_rect.height <= 0:
+            return
+        info = self.levels[level]
+        fx = self.map_size[0] / info['size'][0]
+        fy = self.map_size[1] / info['size'][1]
+        ts_x, ts_y = self.tile_size * fx, self.tile_size * fy
+        for ty in range(int(render_rect.top // ts_y), min(info['rows'], int((render_rect.bottom - 1) // ts_y) + 1)):
+            for tx in range(int(render_rect.left // ts_x), min(info['cols'], int((render_rect.right - 1) // ts_x) + 1)):
+                rect = self.level_tile_rect(level, tx, ty)
+                yield tx, ty, (rect.left * fx, rect.top * fy, rect.right * fx, rect.bottom * fy)
+
+    def draw(self, target, camera, scale):
+        """Desenha em 'target' os tiles do mapa visíveis pela câmara."""
+        t = frame_profiler.start()
+        level = self.choose_level(1 / scale)
+        jobs, positions = [], []
+        for tx, ty, map_edges in self.visible_tiles(level, camera):
+            dest = snap_to_screen(*map_edges, camera, scale)
+            if dest.width <= 0 or dest.height <= 0:
+                continue
+            jobs.append((self.tile(level, tx, ty), dest.size))
+            positions.append(dest.topleft)
+        scaled = scale_pool.scale_many(jobs)
+        t = frame_profiler.stop('map_scale', t)
+        target.blits(list(zip(scaled, positions)), doreturn=False)
+        frame_profiler.stop('map_blit', t)
+
+    def load_fog(self, fallback_color):
+        """Cria a névoa a partir da cache; os tiles parciais apontam para o ficheiro mapeado.
+
+        O ficheiro é mapeado em modo cópia-na-escrita, por isso revelar a névoa
+        altera só a memória do processo e nunca a cache em disco.
+        """
+        fog_color = tuple(self.fog_index['color']) if self.fog_index.get('color') else fallback_color
+        fog = FogLayer(self.map_size, fog_color, self.fog_index['tile_size'])
+        if not self.fog_index['tiles']:
+            return fog
+        fog_map = self._open_map(self.fog_index['file'], mmap.ACCESS_COPY)
+        stride = fog.tile_size * fog.tile_size * len(FOG_TILE_FORMAT)
+        for tx, ty, slot in self.fog_index['tiles']:
+            if slot < 0:
+                fog.tiles[(tx, ty)] = CLEARED
+                continue
+            rect = fog.tile_rect(tx, ty)
+            length = rect.width * rect.height * len(FOG_TILE_FORMAT)
+            data = memoryview(fog_map)[slot * stride:slot * stride + length]
+            fog.tiles[(tx, ty)] = pygame.image.frombuffer(data, rect.size, FOG_TILE_FORMAT)
+        return fog
+
+
+# --- Construção Offline da Cache ---
+def build_tile_cache(map_path, fog_path, cache_dir, tile_size=TILE_CACHE_TILE_SIZE, fog_color=None):
+    """Corta o mapa em tiles sem compressão para cada nível da pirâmide e escreve o índice."""
+    os.makedirs(cache_dir, exist_ok=True)
+    print(f"A carregar '{map_path}'...")
+    pyramid = MapPyramid(pygame.image.load(map_path))
+    index = {
+        'version': TILE_CACHE_VERSION,
+        'tile_size': tile_size,
+        'map_size': list(pyramid.full_size),
+        'levels': [],
+    }
+    stride = tile_size * tile_size * len(MAP_TILE_FORMAT)
+    for level, surface in enumerate(pyramid.levels):
+        file_name = f"map_{level}.bin"
+        cols = math.ceil(surface.get_width() / tile_size)
+        rows = math.ceil(surface.get_height() / tile_size)
+        print(f"Nível {level}: {surface.get_width()}x{surface.get_height()} ({cols * rows} tiles)")
+        with open(os.path.join(cache_dir, file_name), 'wb') as f:
+            for ty in range(rows):
+                for tx in range(cols):
+                    rect = pygame.Rect(tx * tile_size, ty * tile_size, tile_size, tile_size).clip(surface.get_rect())
+                    data = pygame.image.tobytes(surface.subsurface(rect), MAP_TILE_FORMAT)
+                    f.write(data)
+                    f.write(bytes(stride - len(data))) # Tiles de borda ocupam o mesmo espaço
+        index['levels'].append({'file': file_name, 'size': list(surface.get_size()), 'cols': cols, 'rows': rows})
+    del pyramid
+
+    index['fog'] = {'file': 'fog.bin', 'tile_size': tile_size, 'color': list(fog_color) if fog_color else None, 'tiles': []}
+    if fog_path and os.path.isfile(fog_path):
+        print(f"A carregar '{fog_path}'...")
+        fog = FogLayer.from_surface(pygame.image.load(fog_path), fog_color or (0, 0, 0, 0), tile_size)
+        index['fog']['color'] = list(fog.fog_color)
+        fog_stride = tile_size * tile_size * len(FOG_TILE_FORMAT)
+        with open(os.path.join(cache_dir, 'fog.bin'), 'wb') as f:
+            slot = 0
+            for (tx, ty), state in sorted(fog.tiles.items()):
+                if state is CLEARED:
+                    index['fog']['tiles'].append([tx, ty, -1])
+                    continue
+                data = pygame.image.tobytes(state, FOG_TILE_FORMAT)
+                f.write(data)
+                f.write(bytes(fog_stride - len(data)))
+                index['fog']['tiles'].append([tx, ty, slot])
+                slot += 1
+
+    with open(os.path.join(cache_dir, TILE_INDEX_FILE), 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    print(f"Cache de tiles escrita em '{cache_dir}'.")
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Gera a cache de tiles do mapa interativo.")
+    parser.add_argument('--map', default=os.path.join(base_path, 'assets', 'mapa_curitiba.png'))
+    parser.add_argument('--fog', default=os.path.join(base_path, 'assets', 'fog.png'))
+    parser.add_argument('--out', default=os.path.join(base_path, 'assets', 'tile_cache'))
+    parser.add_argument('--tile-size', type=int, default=TILE_CACHE_TILE_SIZE)
+    args = parser.parse_args()
+    build_tile_cache(args.map, args.fog, args.out, args.tile_size)
@@ -0,0 +1,227 @@
+import collections
+import threading
+import pygame
+from viewport import snap_to_screen
+from profiler import frame_profiler
+from parallel_scale import scale_pool
+
+TILE_LOADER_WORKERS = 2
+TILE_MEMORY_BUDGET = 192 * 1024 * 1024 # Bytes máximos de tiles mantidos em memória
+TILE_QUEUE_LIMIT = 256 # Pedidos mais antigos que isto são descartados
+PREFETCH_FRAMES = 12 # Quantos frames à frente da velocidade da câmara pré-carregamos
+COARSE_PRELOAD_TILES = 16 # Níveis com até este número de tiles são carregados logo no início
+
+
+# --- Carregador Assíncrono de Tiles ---
+class TileProvider:
+    """Carrega e escala tiles da TileCache em threads, com uma cache LRU limitada.
+
+    O frame nunca espera pelo disco: tiles em falta são pedidos aos workers e,
+    até chegarem, desenha-se a mesma região a partir de um nível mais grosseiro.
+    """
+
+    def __init__(self, tile_cache, workers=TILE_LOADER_WORKERS, budget_bytes=TILE_MEMORY_BUDGET):
+        self.cache = tile_cache
+        self.map_rect = tile_cache.map_rect
+        self.budget_bytes = budget_bytes
+        self._tiles = collections.OrderedDict() # chave -> Surface (ordem = uso mais recente no fim)
+        self._bytes = 0
+        self._pending = set()
+        self.completed_jobs = 0 # Muda sempre que um worker termina, para o jogo saber que há tiles novos
+        self.used_fallback = False # O último draw teve de usar um nível grosseiro (ou deixou buracos)
+        self._queue = collections.deque()
+        self._lock = threading.Lock()
+        self._has_work = threading.Condition(self._lock)
+        self._running = True
+        self._workers = [threading.Thread(target=self._worker_loop, name=f"tiles-{i}", daemon=True) for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+        self._preload_coarse_levels()
+
+    def close(self):
+        with self._lock:
+            self._running = False
+            self._queue.clear()
+            self._has_work.notify_all()
+
+    # --- Cache LRU ---
+    def _lookup(self, key):
+        with self._lock:
+            surface = self._tiles.get(key)
+            if surface is not None:
+                self._tiles.move_to_end(key)
+            return surface
+
+    def _store(self, key, surface):
+        with self._lock:
+            old = self._tiles.pop(key, None)
+            if old is not None:
+                self._bytes -= _surface_bytes(old)
+            self._tiles[key] = surface
+            self._bytes += _surface_bytes(surface)
+            while self._bytes > self.budget_bytes and len(self._tiles) > 1:
+                _, evicted = self._tiles.popitem(last=False)
+                self._bytes -= _surface_bytes(evicted)
+
+    # --- Fila de pedidos para os workers ---
+    def request(self, tile_key, size=None):
+        """Pede um tile (e opcionalmente a versão escalada para 'size') sem bloquear."""
+        job = (tile_key, size)
+        with self._lock:
+            if job in self._pending:
+                return
+            self._pending.add(job)
+            self._queue.append(job)
+            if len(self._queue) > TILE_QUEUE_LIMIT:
+                self._pending.discard(self._queue.popleft())
+            self._has_work.notify()
+
+    def _worker_loop(self):
+        while True:
+            with self._lock:
+                while self._running and not self._queue:
+                    self._has_work.wait()
+                if not self._running:
+                    return
+                # Os pedidos mais recentes são os mais relevantes para a câmara atual
+                job = self._queue.pop()
+            tile_key, size = job
+            try:
+                raw = self._lookup(tile_key)
+                if raw is None:
+                    raw = self.cache.tile(*tile_key)
+                    # Copiar força a leitura das páginas do ficheiro aqui, fora do frame
+                    raw = raw.convert() if pygame.display.get_surface() else raw.copy()
+                    self._store(tile_key, raw)
+                if size is not None:
+                    self._store(tile_key + size, pygame.transform.scale(raw, size))
+            except (pygame.error, ValueError) as e:
+                print(f"Aviso: não foi possível carregar o tile {tile_key}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(job)
+                    self.completed_jobs += 1
+
+    def is_loading(self):
+        with self._lock:
+            return bool(self._pending)
+
+    def _preload_coarse_levels(self):
+        """Garante que os níveis mais pequenos existem sempre como último recurso."""
+        for level in range(len(self.cache.levels) - 1, -1, -1):
+            info = self.cache.levels[level]
+            if info['cols'] * info['rows'] > COARSE_PRELOAD_TILES:
+                break
+            for ty in range(info['rows']):
+                for tx in range(info['cols']):
+                    self.request((level, tx, ty))
+
+    def thumbnail(self):
+        """O nível mais pequeno da cache inteiro, lido diretamente (é um ou poucos tiles), para o minimapa."""
+        return self.cache.level_surface(len(self.cache.levels) - 1)
+
+    # --- Desenho ---
+    def loaded_tile(self, tile_key):
+        """Devolve o tile se já estiver em memória; senão pede-o aos workers e devolve None."""
+        surface = self._lookup(tile_key)
+        if surface is None:
+            self.request(tile_key)
+        return surface
+
+    def coarser_source(self, level, map_edges):
+        """Procura a mesma região num tile já carregado de um nível mais grosseiro.
+
+        Devolve (chave do tile, tile, área dentro do tile) ou None.
+        """
+        ts = self.cache.tile_size
+        left, top, right, bottom = map_edges
+        for parent_level in range(level + 1, len(self.cache.levels)):
+            level_w, level_h = self.cache.levels[parent_level]['size']
+            fx = level_w / self.map_rect.width
+            fy = level_h / self.map_rect.height
+            px, py = int(left * fx), int(top * fy)
+            parent_key = (parent_level, px // ts, py // ts)
+            parent = self._lookup(parent_key)
+            if parent is None:
+                continue
+            area = pygame.Rect(px % ts, py % ts, max(1, round((right - left) * fx)), max(1, round((bottom - top) * fy)))
+            area = area.clip(parent.get_rect())
+            if area.width <= 0 or area.height <= 0:
+                return None
+            return parent_key, parent, area
+        return None
+
+    def _coarser_area(self, level, map_edges):
+        """Recorta a mesma região de um tile já carregado num nível mais grosseiro."""
+        found = self.coarser_source(level, map_edges)
+        return found[1].subsurface(found[2]) if found else None
+
+    def draw(self, target, camera, scale):
+        """Desenha em 'target' os tiles visíveis, sem nunca esperar pelo disco."""
+        t = frame_profiler.start()
+        level = self.cache.choose_level(1 / scale)
+        blit_list = []
+        jobs, job_slots = [], [] # Tiles ainda por escalar, escalados juntos em paralelo no fim
+        self.used_fallback = False
+        for tx, ty, map_edges in self.cache.visible_tiles(level, camera):
+            dest = snap_to_screen(*map_edges, camera, scale)
+            if dest.width <= 0 or dest.height <= 0:
+                continue
+            tile_key = (level, tx, ty)
+            scaled = self._lookup(tile_key + dest.size)
+            if scaled is not None:
+                blit_list.append((scaled, dest.topleft))
+                continue
+            source, store_key = self._lookup(tile_key), tile_key + dest.size
+            if source is None:
+                self.request(tile_key, dest.size)
+                self.used_fallback = True
+                source, store_key = self._coarser_area(level, map_edges), None
+            if source is not None:
+                jobs.append((source, dest.size))
+                job_slots.append((len(blit_list), store_key))
+                blit_list.append((None, dest.topleft))
+        for (slot, store_key), scaled in zip(job_slots, scale_pool.scale_many(jobs)):
+            if store_key is not None:
+                self._store(store_key, scaled)
+            blit_list[slot] = (scaled, blit_list[slot][1])
+        t = frame_profiler.stop('map_scale', t)
+        target.blits(blit_list, doreturn=False)
+        frame_profiler.stop('map_blit', t)
+
+    def draw_textured(self, textures, camera, scale):
+        """Como draw, mas cada tile é enviado uma vez como textura e escalado pelo renderer."""
+        level = self.cache.choose_level(1 / scale)
+        self.used_fallback = False
+        for tx, ty, map_edges in self.cache.visible_tiles(level, camera):
+            dest = snap_to_screen(*map_edges, camera, scale)
+            if dest.width <= 0 or dest.height <= 0:
+                continue
+            tile_key = (level, tx, ty)
+            texture = textures.get(('map',) + tile_key, lambda: self.loaded_tile(tile_key))
+            if texture is not None:
+                texture.draw(dstrect=dest)
+                continue
+            self.used_fallback = True
+            found = self.coarser_source(level, map_edges)
+            if found is not None:
+                parent_key, parent, area = found
+                textures.get(('map',) + parent_key, lambda: parent).draw(srcrect=area, dstrect=dest)
+
+    def prefetch(self, camera, scale, velocity=(0, 0), zoom_camera=None, zoom_scale=None):
+        """Pede os tiles para onde a câmara se está a mover e para o próximo passo de zoom."""
+        if velocity[0] or velocity[1]:
+            level = self.cache.choose_level(1 / scale)
+            ahead = camera.move(velocity[0] * PREFETCH_FRAMES, velocity[1] * PREFETCH_FRAMES)
+            for tx, ty, _ in self.cache.visible_tiles(level, ahead):
+                if self._lookup((level, tx, ty)) is None:
+                    self.request((level, tx, ty))
+        if zoom_camera is not None:
+            level = self.cache.choose_level(1 / zoom_scale)
+            for tx, ty, _ in self.cache.visible_tiles(level, zoom_camera):
+                if self._lookup((level, tx, ty)) is None:
+                    self.request((level, tx, ty))
+
+
+def _surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
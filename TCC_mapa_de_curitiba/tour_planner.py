@@ -0,0 +1,317 @@
+import math
+import time
+
+import numpy as np
+
+KD_LEAF_SIZE = 16 # POIs por folha da árvore; cada folha é comparada de uma vez com NumPy
+KD_KNN_BATCH = 64 # Folhas tratadas de uma vez no cálculo dos vizinhos de todos os POIs
+TOUR_NEIGHBOURS = 8 # Vizinhos mais próximos de cada POI considerados pelo 2-opt
+TOUR_OPTIMIZE_TIME = 0.05 # Tempo máximo (s) de melhoria 2-opt por planeamento
+
+
+# --- Árvore KD sobre as Posições dos POIs ---
+class KdTree:
+    """Árvore KD com folhas de até KD_LEAF_SIZE pontos e marcação de pontos já usados.
+
+    Cada nó guarda a caixa dos seus pontos e quantos ainda estão "vivos", por
+    isso a pesquisa do vizinho mais próximo salta as sub-árvores já esgotadas
+    e continua logarítmica enquanto os POIs vão sendo visitados.
+    """
+
+    def __init__(self, positions, leaf_size=KD_LEAF_SIZE):
+        self.points = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        count = len(self.points)
+        self.perm = np.arange(count) # Linhas reordenadas: cada folha é um intervalo contíguo
+        self.leaf_of = np.zeros(count, dtype=np.int64)
+        self.alive = np.ones(count, dtype=bool)
+        # Por nó: filhos (None nas folhas), intervalo em perm, caixa e pai
+        self.children = []
+        self.ranges = []
+        self.lo = []
+        self.hi = []
+        self.parent = []
+        if count:
+            self._build(0, count, -1, leaf_size)
+        self.lo = np.array(self.lo).reshape(-1, 2)
+        self.hi = np.array(self.hi).reshape(-1, 2)
+        self.boxes = np.hstack([self.lo, self.hi]).tolist() # Cópia em listas: mais rápida nas pesquisas em Python
+        self.alive_count = [end - start for start, end in self.ranges]
+
+    def __len__(self):
+        return len(self.points)
+
+    def _build(self, start, end, parent, leaf_size):
+        node = len(self.children)
+        rows = self.perm[start:end]
+        pts = self.points[rows]
+        self.children.append(None)
+        self.ranges.append((start, end))
+        self.lo.append(pts.min(axis=0))
+        self.hi.append(pts.max(axis=0))
+        self.parent.append(parent)
+        if end - start <= leaf_size:
+            self.leaf_of[rows] = node
+            return node
+        # Divide pelo eixo mais comprido, na mediana
+        axis = int(np.argmax(self.hi[node] - self.lo[node]))
+        mid = (end - start) // 2
+        self.perm[start:end] = rows[np.argpartition(pts[:, axis], mid)]
+        left = self._build(start, start + mid, node, leaf_size)
+        right = self._build(start + mid, end, node, leaf_size)
+        self.children[node] = (left, right)
+        return node
+
+    def reset(self, alive):
+        """Define que pontos estão vivos (array de bools por linha) e recalcula as contagens dos nós."""
+        self.alive = np.array(alive, dtype=bool)
+        for node in range(len(self.children) - 1, -1, -1): # Os filhos vêm sempre depois do pai
+            kids = self.children[node]
+            if kids is None:
+                start, end = self.ranges[node]
+                self.alive_count[node] = int(self.alive[self.perm[start:end]].sum())
+            else:
+                self.alive_count[node] = self.alive_count[kids[0]] + self.alive_count[kids[1]]
+
+    def remove(self, row):
+        """Marca a linha como usada, para deixar de aparecer em nearest()."""
+        if not self.alive[row]:
+            return
+        self.alive[row] = False
+        node = int(self.leaf_of[row])
+        while node >= 0:
+            self.alive_count[node] -= 1
+            node = self.parent[node]
+
+    def _box_distance2(self, node, x, y):
+        lo_x, lo_y, hi_x, hi_y = self.boxes[node]
+        dx = lo_x - x if x < lo_x else (x - hi_x if x > hi_x else 0.0)
+        dy = lo_y - y if y < lo_y else (y - hi_y if y > hi_y else 0.0)
+        return dx * dx + dy * dy
+
+    def nearest(self, point):
+        """Linha viva mais próxima do ponto, ou None se já não houver nenhuma."""
+        if not self.children or not self.alive_count[0]:
+            return None
+        x, y = float(point[0]), float(point[1])
+        best_row, best_d2 = None, math.inf
+        stack = [(0.0, 0)]
+        while stack:
+            box_d2, node = stack.pop()
+            if box_d2 >= best_d2 or not self.alive_count[node]:
+                continue
+            kids = self.children[node]
+            if kids is None:
+                start, end = self.ranges[node]
+                rows = self.perm[start:end]
+                rows = rows[self.alive[rows]]
+                delta = self.points[rows] - (x, y)
+                d2 = np.einsum('ij,ij->i', delta, delta)
+                i = int(np.argmin(d2))
+                if d2[i] < best_d2:
+                    best_row, best_d2 = int(rows[i]), float(d2[i])
+                continue
+            # O filho mais próximo fica no topo da pilha
+            left, right = kids
+            left_d2, right_d2 = self._box_distance2(left, x, y), self._box_distance2(right, x, y)
+            if left_d2 <= right_d2:
+                stack += ((right_d2, right), (left_d2, left))
+            else:
+                stack += ((left_d2, left), (right_d2, right))
+        return best_row
+
+    def nearest_k(self, k):
+        """Para cada linha, as k linhas mais próximas (sem ela própria), da mais perto para a mais longe.
+
+        Calculado para muitas folhas de uma vez com NumPy: cada folha compara os
+        seus pontos com os das folhas a menos de 'radius' da sua caixa. Só as
+        folhas em que o k-ésimo vizinho pode estar mais longe do que isso são
+        repetidas, com o raio a dobrar.
+        """
+        count = len(self.points)
+        k = min(k, count - 1)
+        neighbours = np.zeros((count, max(k, 0)), dtype=np.int64)
+        if k <= 0:
+            return neighbours
+        leaves = np.array([node for node, kids in enumerate(self.children) if kids is None])
+        leaf_lo, leaf_hi = self.lo[leaves], self.hi[leaves]
+        # Linhas de cada folha numa tabela (folhas x KD_LEAF_SIZE), -1 onde a folha tem menos pontos
+        size = max(self.ranges[leaf][1] - self.ranges[leaf][0] for leaf in leaves)
+        table = np.full((len(leaves), size + 1), -1, dtype=np.int64) # Coluna extra sempre -1
+        for i, leaf in enumerate(leaves):
+            rows = self.perm[slice(*self.ranges[leaf])]
+            table[i, :len(rows)] = rows
+        points = np.vstack([self.points, (1e100, 1e100)]) # A linha -1 (vazia) fica longe de tudo
+
+        radius = np.maximum((leaf_hi - leaf_lo).max(axis=1), 1.0)
+        pending = np.arange(len(leaves))
+        while pending.size:
+            retry = []
+            for batch in np.array_split(pending, -(-len(pending) // KD_KNN_BATCH)):
+                gap = np.maximum(0.0, np.maximum(leaf_lo[None] - leaf_hi[batch, None], leaf_lo[batch, None] - leaf_hi[None]))
+                near = np.einsum('ijk,ijk->ij', gap, gap) <= (radius[batch] ** 2)[:, None]
+                near_count = near.sum(axis=1)
+                # Folhas próximas primeiro; as restantes colunas apontam para a coluna vazia da tabela
+                near_leaves = np.argsort(~near, axis=1, kind='stable')[:, :near_count.max()]
+                near_leaves[np.arange(near_leaves.shape[1])[None] >= near_count[:, None]] = -1
+                candidates = np.where((near_leaves >= 0)[:, :, None], table[near_leaves], -1).reshape(len(batch), -1)
+                queries = table[batch, :size]
+                query_pts, candidate_pts = points[queries], points[candidates]
+                d2 = ((query_pts[:, :, None, 0] - candidate_pts[:, None, :, 0]) ** 2
+                      + (query_pts[:, :, None, 1] - candidate_pts[:, None, :, 1]) ** 2)
+                d2[queries[:, :, None] == candidates[:, None, :]] = math.inf
+                nearest = np.argpartition(d2, k - 1, axis=2)[:, :, :k]
+                nearest_d2 = np.take_along_axis(d2, nearest, axis=2)
+                # Pontos fora das folhas próximas estão a mais de 'radius': o resultado é exato
+                worst = np.where(queries >= 0, nearest_d2.max(axis=2), 0.0).max(axis=1)
+                done = (worst <= radius[batch] ** 2) | (near_count == len(leaves))
+                order = np.argsort(nearest_d2, axis=2)
+                found = np.take_along_axis(candidates[:, None, :], np.take_along_axis(nearest, order, axis=2), axis=2)
+                valid = done[:, None] & (queries >= 0)
+                neighbours[queries[valid]] = found[valid]
+                retry.append(batch[~done])
+            pending = np.concatenate(retry)
+            radius[pending] *= 2
+        return neighbours
+
+
+# --- Percurso de Visita dos POIs ---
+def nearest_neighbour_tour(tree, neighbours, start, members):
+    """Percurso que começa em 'start' e vai sempre para o membro mais próximo ainda por visitar."""
+    tree.reset(members)
+    tree.remove(start)
+    tour = [start]
+    current = start
+    remaining = int(tree.alive_count[0]) if len(tree) else 0
+    for _ in range(remaining):
+        # Os vizinhos estão ordenados: o primeiro ainda vivo é o mais próximo; senão pergunta-se à árvore
+        nxt = next((c for c in neighbours[current] if tree.alive[c]), None)
+        if nxt is None:
+            nxt = tree.nearest(tree.points[current])
+        tree.remove(nxt)
+        tour.append(nxt)
+        current = nxt
+    return tour
+
+
+def two_opt(tour, xs, ys, neighbours, time_limit=TOUR_OPTIMIZE_TIME):
+    """Melhora o percurso aberto (o primeiro POI fica fixo) com trocas 2-opt entre vizinhos próximos.
+
+    Uma troca entre as posições p < q inverte tour[p+1..q]: as arestas
+    (p, p+1) e (q, q+1) passam a (p, q) e (p+1, q+1). Só se tentam pares em que
+    um POI é vizinho próximo do outro, e cada POI só volta à fila quando uma
+    aresta sua muda. Devolve o percurso melhorado (lista) e o comprimento poupado.
+    """
+    order = list(tour)
+    count = len(order)
+    position = [-1] * len(xs) # -1: POI fora deste percurso (já concluído)
+    for i, row in enumerate(order):
+        position[row] = i
+    queue = list(order)
+    queued = set(queue)
+    deadline = time.perf_counter() + time_limit
+
+    def dist(a, b):
+        return math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+    def try_move(p, q):
+        if p > q:
+            p, q = q, p
+        if p < 0 or q - p < 2:
+            return 0.0
+        a, b, c = order[p], order[p + 1], order[q]
+        if q + 1 < count:
+            d = order[q + 1]
+            gain = dist(a, b) + dist(c, d) - dist(a, c) - dist(b, d)
+        else: # Fim do percurso: a última aresta não existe
+            gain = dist(a, b) - dist(a, c)
+        if gain <= 1e-9:
+            return 0.0
+        order[p + 1:q + 1] = order[p + 1:q + 1][::-1]
+        for i in range(p + 1, q + 1):
+            position[order[i]] = i
+        for row in (a, b, c, order[min(q + 1, count - 1)]):
+            if row not in queued:
+                queued.add(row)
+                queue.append(row)
+        return gain
+
+    saved = 0.0
+    while queue and time.perf_counter() < deadline:
+        a = queue.pop()
+        queued.discard(a)
+        for c in neighbours[a]:
+            j = position[c]
+            if j < 0:
+                continue
+            i = position[a]
+            # Liga a a c e os sucessores entre si, ou a a c e os antecessores entre si
+            gain = try_move(i, j) or try_move(i - 1, j - 1)
+            if gain:
+                saved += gain
+                break
+    return order, saved
+
+
+class TourPlanner:
+    """Ordem de visita dos POIs e "próximo POI por concluir" depois de cada conclusão.
+
+    O plano é um percurso curto (vizinho mais próximo + 2-opt) a partir de um
+    POI. Concluir um POI, pela ordem ou não, só o tira do percurso: o próximo
+    por concluir é encontrado com union-find sobre as posições do percurso (os
+    concluídos apontam para a posição seguinte), sem percorrer a lista. Tirar
+    pontos de um percurso nunca o torna mais comprido; plan() volta a planear
+    os que faltam a partir de outro POI (por exemplo, depois de restaurar o progresso).
+    """
+
+    def __init__(self, positions, start=0, completed=None):
+        """'completed' pode ser um array de bools partilhado (por exemplo, PoiArrays.completed)."""
+        self.tree = KdTree(positions)
+        self.neighbours = self.tree.nearest_k(TOUR_NEIGHBOURS).tolist()
+        self.xs = self.tree.points[:, 0].tolist()
+        self.ys = self.tree.points[:, 1].tolist()
+        self.completed = np.zeros(len(self.tree), dtype=bool) if completed is None else completed
+        self.order = []
+        self.position = np.full(len(self.tree), -1, dtype=np.int64) # Posição de cada linha em self.order
+        self._next = [0] # Union-find sobre as posições; len(order) é a sentinela "acabou"
+        if len(self.tree):
+            self.plan(start)
+
+    def __len__(self):
+        return len(self.tree)
+
+    def plan(self, start):
+        """Planeia o percurso dos POIs por concluir a começar em 'start'."""
+        members = ~self.completed
+        members[start] = True
+        tour = nearest_neighbour_tour(self.tree, self.neighbours, start, members)
+        self.order, _ = two_opt(tour, self.xs, self.ys, self.neighbours)
+        self.position[:] = -1
+        self.position[self.order] = np.arange(len(self.order))
+        self._next = list(range(len(self.order) + 1))
+        for i, row in enumerate(self.order):
+            if self.completed[row]:
+                self._next[i] = i + 1
+
+    def _find(self, i):
+        root = i
+        while self._next[root] != root:
+            root = self._next[root]
+        while self._next[i] != root: # Compressão do caminho
+            self._next[i], i = root, self._next[i]
+        return root
+
+    def complete(self, row):
+        """Regista a conclusão de 'row' e devolve o próximo POI por concluir (None quando acabaram)."""
+        self.completed[row] = True
+        i = int(self.position[row])
+        if i >= 0:
+            self._next[i] = i + 1
+        return self.next_after(row)
+
+    def next_after(self, row):
+        """Primeiro POI por concluir depois de 'row' no percurso (volta ao início se preciso)."""
+        i = int(self.position[row])
+        found = self._find(i + 1) if i >= 0 else len(self.order)
+        if found == len(self.order):
+            found = self._find(0)
+        return self.order[found] if found < len(self.order) else None
@@ -0,0 +1,21 @@
+import os
+import sys
+
+APP_DIR_NAME = 'MapaCuritiba'
+
+
+def user_data_dir(*parts):
+    """Pasta gravável do utilizador para dados do jogo (a pasta do executável pode ser só de leitura).
+
+    Windows: %APPDATA%; macOS: ~/Library/Application Support; outros: $XDG_DATA_HOME ou ~/.local/share.
+    A pasta é criada se ainda não existir.
+    """
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    path = os.path.join(base, APP_DIR_NAME, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
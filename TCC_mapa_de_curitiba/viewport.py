@@ -0,0 +1,27 @@
+import collections
+import math
+import pygame
+
+# Vista do mapa com posição em floats; os métodos de desenho aceitam-na no lugar da Rect da câmara
+MapView = collections.namedtuple('MapView', 'x y width height')
+
+
+# --- Funções Auxiliares de Conversão Mapa -> Ecrã ---
+def camera_render_rect(camera, map_rect):
+    """Região inteira do mapa visível pela câmara, recortada aos limites do mapa."""
+    left, top = math.floor(camera.x), math.floor(camera.y)
+    right, bottom = math.ceil(camera.x + camera.width), math.ceil(camera.y + camera.height)
+    return pygame.Rect(left, top, right - left, bottom - top).clip(map_rect)
+
+
+def snap_to_screen(left, top, right, bottom, camera, scale):
+    """Converte um retângulo do mapa (em floats) para um Rect do ecrã.
+
+    As duas bordas são arredondadas separadamente para que tiles vizinhos
+    partilhem exatamente a mesma borda e não deixem frestas entre si.
+    """
+    x0 = round((left - camera.x) * scale)
+    y0 = round((top - camera.y) * scale)
+    x1 = round((right - camera.x) * scale)
+    y1 = round((bottom - camera.y) * scale)
+    return pygame.Rect(x0, y0, x1 - x0, y1 - y0)